@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,8 +6,121 @@ class Settings(BaseSettings):
     api_prefix: str = "/api"
     debug: bool = False
     session_timeout_minutes: int = 30
+    # SQLite database (WAL mode) holding one row per session
+    session_store_path: str = "data/sessions.sqlite3"
+    # Expired sessions are evicted by a background sweep, in batches
+    session_expiry_interval_seconds: float = 60.0
+    session_expiry_batch_size: int = 500
+    # Conversation memory: the last turns of each session are kept for follow-up
+    # questions, older ones are folded into an LLM-written summary
+    conversation_max_turns: int = 8
+    conversation_summarise_turns: int = 4
+    conversation_context_tokens: int = 600
+    conversation_max_turn_chars: int = 2000
+    conversation_max_sessions: int = 5000
+    conversation_max_chars: int = 20_000_000
+    conversation_summaries_enabled: bool = True
+    # Shared outbound HTTP client: pooled keep-alive connections for all calls
+    http_pool_size: int = 100
+    http_keepalive_seconds: float = 30.0
+    http_timeout_seconds: float = 15.0
+    # Serper web search: memory LRU over a SQLite cache; stale results are served
+    # while a background call refreshes them
+    serper_url: str = "https://google.serper.dev/search"
+    serper_cache_path: str = "data/serper_cache.sqlite3"
+    serper_cache_max_entries: int = 1000
+    serper_fresh_seconds: int = 60 * 60
+    serper_stale_seconds: int = 24 * 60 * 60
+    # Feedback is appended to a JSON Lines log; submissions arriving within the
+    # flush interval are written and fsynced together
+    feedback_log_path: str = "data/feedback.jsonl"
+    feedback_flush_interval_ms: float = 50.0
+    feedback_batch_max_size: int = 256
+    # Logging: records are queued and written by a background thread; DEBUG output
+    # of the loggers listed here is sampled at the given rate
+    log_level: str = "INFO"
+    log_queue_size: int = 10000
+    log_sample_rates: Dict[str, float] = {
+        "asha-backend.scrapers": 0.1,
+    }
+    # OpenTelemetry: stage spans are exported to this OTLP/gRPC collector when set
+    # (e.g. "localhost:4317"); /metrics works either way
+    otel_exporter_endpoint: str = ""
+    otel_service_name: str = "asha-backend"
     job_api_url: str = "https://api.jobsforher.com/jobs"
     event_api_url: str = "https://api.jobsforher.com/events"
+    embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # /query requests arriving within the window are embedded and searched as one batch
+    rag_batch_window_ms: float = 5.0
+    rag_batch_max_size: int = 32
+    # Retrieval: "hybrid" fuses BM25 and dense rankings, "dense" uses vectors only
+    rag_retrieval_mode: str = "hybrid"
+    rag_top_k: int = 1
+    rag_candidate_k: int = 20
+    rag_rrf_k: int = 60
+    # Vector backend: "chroma", or "numpy" for exact search over a memory-mapped
+    # matrix shared by all workers (float32, or float16 to halve its size)
+    rag_vector_backend: str = "chroma"
+    rag_numpy_dtype: str = "float32"
+    # Embedding intent router: below the threshold the LLM classifies the intent,
+    # at or above the exact threshold the query is one of our vetted phrasings
+    intent_router_enabled: bool = True
+    intent_router_threshold: float = 0.75
+    intent_router_exact_threshold: float = 0.97
+    # Semantic response cache: "off", "memory" or "disk" (persisted to response_cache_path)
+    response_cache_mode: str = "memory"
+    response_cache_path: str = "data/response_cache.sqlite3"
+    response_cache_threshold: float = 0.92
+    response_cache_max_entries: int = 1000
+    response_cache_ttl_seconds: Dict[str, int] = {
+        "job_listing": 15 * 60,
+        "event": 30 * 60,
+        "mentorship": 60 * 60,
+        "faq": 24 * 60 * 60,
+        "unknown": 60 * 60,
+    }
+    # Time budget of a chat request, overridable per request. Scrapers stop
+    # paginating once it runs low and return what they have, leaving the
+    # reserve for the final LLM call
+    chat_deadline_seconds: float = 45.0
+    chat_llm_reserve_seconds: float = 10.0
+    # Selenium scrapers run on their own bounded thread pool, off the event loop
+    scrape_pool_workers: int = 2
+    scrape_queue_size: int = 8
+    scrape_timeout_seconds: float = 90.0
+    # Warm headless Chrome drivers shared by the scrapers, one per scrape worker
+    driver_pool_size: int = 2
+    driver_max_uses: int = 20
+    driver_acquire_timeout_seconds: float = 30.0
+    driver_prelaunch: bool = True
+    # Fast-load profile: scraper drivers return from page loads at DOMContentLoaded
+    # ("eager") and block the kinds of resources listed here (see
+    # app/services/fast_load.py) unless a source allows them
+    scraper_page_load_strategy: str = "eager"
+    scraper_fast_load: bool = True
+    scraper_fast_load_block: List[str] = ["image", "media", "font", "stylesheet", "tracker"]
+    scraper_fast_load_allow: Dict[str, List[str]] = {
+        # Pagination checks whether the next button is displayed, which needs the page's CSS
+        "naukri_jobs": ["stylesheet"],
+    }
+    # "script" reads all listing cards with one injected extractor, "webdriver" walks them call by call
+    scraper_extraction_mode: str = "script"
+    # Background ingestion: each source is re-scraped every interval (+/- jitter)
+    ingestion_enabled: bool = True
+    ingestion_intervals_seconds: Dict[str, int] = {
+        "herkey_jobs": 30 * 60,
+        "naukri_jobs": 30 * 60,
+        "herkey_events": 60 * 60,
+        "herkey_mentorship": 6 * 60 * 60,
+    }
+    ingestion_jitter: float = 0.1
+    ingestion_timeout_seconds: float = 300.0
+    ingestion_queries: Dict[str, str] = {
+        "herkey_jobs": "",
+        "naukri_jobs": "jobs for women",
+        "herkey_events": "",
+        "herkey_mentorship": "mentorship",
+    }
     
     class Config:
         env_file = ".env"
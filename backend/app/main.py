@@ -1,3 +1,4 @@
+import asyncio
 import sys
 from pathlib import Path
 
@@ -8,10 +9,16 @@ sys.path.append(str(backend_dir))
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import chat, feedback
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.routers import chat, feedback, ingestion, search
 from app.config import settings
 from pydantic import BaseModel
-from app.services.rag_service import RAGService
+from typing import Optional
+from app.models.retrieval import RetrievalFilters
+from app.services.readiness import readiness
+from app.services.scrape_pool import scrape_pool
+from app.utils.logger import logger
+from app.utils.metrics import registry, setup_tracing
 
 
 app = FastAPI(title="Asha Chatbot API", version="1.0.0")
@@ -31,20 +38,112 @@ app.include_router(chat.router, prefix="/api", tags=["chat"])
 # app.include_router(events.router, prefix="/api", tags=["events"])
 # app.include_router(mentorship.router, prefix="/api", tags=["mentorship"])
 app.include_router(feedback.router, prefix="/api", tags=["feedback"])
+app.include_router(ingestion.router, prefix="/api", tags=["ingestion"])
+app.include_router(search.router, prefix="/api", tags=["search"])
 
-rag_service = RAGService()
+# Built in the background after startup; langchain, Chroma and Selenium are
+# only imported there so the app can accept connections straight away
+rag_service = None
+ingestion_scheduler = None
+driver_pool = None
+warmup_task = None
+
+# Seconds a client is told to wait before retrying while a component warms up
+RETRY_AFTER_SECONDS = 5
 
 class Query(BaseModel):
     question: str
+    filters: Optional[RetrievalFilters] = None
 
 @app.post("/query")
 async def query_rag(query: Query):
+    if rag_service is None or not readiness.is_ready("vector_store"):
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge base is still loading",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
     try:
-        response = rag_service.query(query.question)
+        response = await rag_service.aquery(query.question, query.filters)
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _load_embeddings():
+    from app.services.embeddings import get_embeddings
+    # One embedding call so the model weights are actually loaded
+    get_embeddings().embed_query("warm-up")
+
+def _load_vector_store():
+    from app.services.rag_service import RAGService
+    return RAGService()
+
+def _load_chat_service():
+    chat.get_chat_service().warm_up()
+
+def _load_scrapers():
+    from app.services.driver_pool import driver_pool
+    from app.services.ingestion import ingestion_scheduler
+    if settings.driver_prelaunch:
+        driver_pool.warm()
+    return ingestion_scheduler, driver_pool
+
+async def warm_up():
+    global rag_service, ingestion_scheduler, driver_pool
+    # Everything else shares the embedding model, so it is loaded first
+    await readiness.warm("embeddings", _load_embeddings)
+    rag_service, _, scrapers = await asyncio.gather(
+        readiness.warm("vector_store", _load_vector_store),
+        readiness.warm("chat", _load_chat_service),
+        readiness.warm("scrapers", _load_scrapers),
+    )
+    if scrapers:
+        ingestion_scheduler, driver_pool = scrapers
+        if settings.ingestion_enabled:
+            ingestion_scheduler.start()
+
+@app.on_event("startup")
+async def start_warm_up():
+    global warmup_task
+    from app.storage.session_store import session_store
+    from app.utils.http_client import get_http_session
+    setup_tracing()
+    session_store.expiry.start()
+    await get_http_session()
+    warmup_task = asyncio.create_task(warm_up())
+    logger.info("Accepting connections, warming up components in the background")
+
+@app.on_event("shutdown")
+async def shutdown_background_work():
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    from app.storage.session_store import session_store
+    from app.utils.http_client import close_http_session
+    await session_store.expiry.stop()
+    await close_http_session()
+    if ingestion_scheduler:
+        await ingestion_scheduler.stop()
+    scrape_pool.shutdown()
+    if driver_pool:
+        driver_pool.shutdown()
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    State of each warmed-up component; 503 until all of them are ready
+    """
+    return JSONResponse(
+        status_code=200 if readiness.all_ready else 503,
+        content=readiness.snapshot()
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Stage latencies, cache lookups, mock fallbacks and scrape timeouts in the Prometheus text format
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 from datetime import datetime
 
 class ChatMessage(BaseModel):
@@ -12,8 +12,30 @@ class ChatRequest(BaseModel):
     session_id: str
     query: str
     contact_info: Optional[str] = None
+    # Overrides settings.chat_deadline_seconds for this request
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, le=300)
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
-    timestamp: datetime = datetime.now()
\ No newline at end of file
+    timestamp: datetime = datetime.now()
+
+Intent = Literal["job_listing", "event", "mentorship", "faq", "unknown"]
+
+class BiasCheck(BaseModel):
+    """Structured output of the gender bias check"""
+    is_biased: bool = Field(
+        default=False,
+        description="true if the query contains gender bias, otherwise false"
+    )
+    alternative_response: Optional[str] = Field(
+        default=None,
+        description="an unbiased rephrasing of the query when is_biased is true, otherwise null"
+    )
+
+class QueryAnalysis(BiasCheck):
+    """Structured output of the single bias + intent analysis LLM call"""
+    intent: Intent = Field(
+        default="unknown",
+        description="the intent of the query"
+    )
\ No newline at end of file
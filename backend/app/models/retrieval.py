@@ -0,0 +1,21 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+class RetrievalFilters(BaseModel):
+    """
+    Structured filters applied before ranking. Values within one facet are
+    alternatives (any may match); different facets must all match.
+    """
+    sources: List[str] = []
+    locations: List[str] = []
+    skills: List[str] = []
+    companies: List[str] = []
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def is_empty(self) -> bool:
+        return not (
+            self.sources or self.locations or self.skills or self.companies
+            or self.date_from or self.date_to
+        )
@@ -6,19 +6,126 @@ current_dir = Path(__file__).resolve().parent
 backend_dir = current_dir.parent.parent
 sys.path.append(str(backend_dir))
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import threading
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.config import settings
 from app.models.chat import ChatRequest, ChatResponse
-from app.services.chat_service import ChatService
+from app.services.scrape_pool import scrape_pool
+from app.utils.deadline import Deadline
 from app.utils.logger import logger
 
 router = APIRouter()
-chat_service = ChatService()
+chat_service = None
+chat_service_lock = threading.Lock()
+
+def get_chat_service():
+    """
+    Builds the ChatService on first use. Importing it loads langchain, the
+    Gemini client and the scrapers, so this is kept off the import path.
+    """
+    global chat_service
+    with chat_service_lock:
+        if chat_service is None:
+            from app.services.chat_service import ChatService
+            chat_service = ChatService()
+    return chat_service
+
+def _deadline(chat_request: ChatRequest) -> Deadline:
+    # Started before the service is fetched, so a slow warm-up counts against the budget
+    return Deadline(chat_request.deadline_seconds or settings.chat_deadline_seconds)
+
+async def _chat_service():
+    # Requests arriving before the warm-up finished wait for it off the event loop
+    return chat_service or await asyncio.to_thread(get_chat_service)
+
+# How often a pending /chat request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
+async def _run_until_disconnect(request: Request, coro):
+    """
+    Runs coro while the client stays connected and cancels it, along with any
+    queued scrape, as soon as the client goes away. Returns None on disconnect.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling chat request")
+                task.cancel()
+                return None
+    finally:
+        if not task.done():
+            task.cancel()
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(chat_request: ChatRequest):
+async def chat_endpoint(chat_request: ChatRequest, request: Request):
     try:
-        print("chat is wokrng",chat_request)
-        return await chat_service.process_message(chat_request)
+        logger.debug("Chat request: %s", chat_request)
+        deadline = _deadline(chat_request)
+        service = await _chat_service()
+        response = await _run_until_disconnect(request, service.process_message(chat_request, deadline))
+        if response is None:
+            # 499: client closed the request, nobody is left to read the body
+            return Response(status_code=499)
+        return response
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(chat_request: ChatRequest):
+    """
+    Stream the chat reply as Server-Sent Events (intent, token..., done)
+    """
+    async def event_stream():
+        try:
+            deadline = _deadline(chat_request)
+            service = await _chat_service()
+            async for event in service.stream_message(chat_request, deadline):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            logger.error(f"Error in chat stream endpoint: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Internal server error'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chat/cache/stats")
+async def chat_cache_stats():
+    """
+    Hit/miss counters of the semantic response cache
+    """
+    service = await _chat_service()
+    if service.response_cache is None:
+        return {"mode": "off"}
+    return service.response_cache.stats()
+
+
+@router.get("/chat/scrape/stats")
+async def chat_scrape_stats():
+    """
+    Queue depth and outcome counters of the scraper worker pool, and
+    utilisation of the Chrome driver pool it borrows browsers from
+    """
+    from app.services.driver_pool import driver_pool
+    return {**scrape_pool.stats(), "drivers": driver_pool.stats()}
+
+
+@router.get("/chat/sessions/stats")
+async def chat_session_stats():
+    """
+    Sessions tracked for expiry, and how many the background sweep has
+    evicted and how long its sweeps take
+    """
+    from app.storage.session_store import session_store
+    return session_store.expiry.stats()
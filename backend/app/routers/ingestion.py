@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent.parent
+sys.path.append(str(backend_dir))
+
+from fastapi import APIRouter
+
+router = APIRouter()
+
+@router.get("/ingestion/status")
+async def ingestion_status():
+    """
+    Last refresh time, duration and item count of each scraped source
+    """
+    # Imported here so loading the router does not pull in Selenium
+    from app.services.ingestion import ingestion_scheduler
+    return ingestion_scheduler.stats()
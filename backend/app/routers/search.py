@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent.parent
+sys.path.append(str(backend_dir))
+
+from fastapi import APIRouter
+from app.models.chat import ChatRequest, ChatResponse
+from app.services.serper_service import search_serper
+
+router = APIRouter()
+
+@router.post("/search", response_model=ChatResponse)
+async def search_endpoint(search_request: ChatRequest):
+    """
+    Web search for the frontend's quick actions, through the pooled Serper
+    client and its cache
+    """
+    result = await search_serper(search_request.query)
+    return ChatResponse(response=result, session_id=search_request.session_id)
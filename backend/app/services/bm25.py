@@ -0,0 +1,61 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Keeps tokens like "c#", "c++" and ".net" whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9.#+]*[a-z0-9#+]")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index scoring documents with Okapi BM25, used next to
+    the dense vectors so exact tokens (a skill, a city, a company) still match.
+    """
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths: List[int] = []
+        for doc_index, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings[term].append((doc_index, count))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        total = len(self.lengths)
+        self.idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query: str, k: int, allowed: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Returns up to k (document index, score) pairs, best first. With allowed,
+        only those document indexes are scored.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_index, count in self.postings[term]:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_index] / self.avg_length)
+                scores[doc_index] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[str]:
+    """Merges ranked id lists; each list adds 1 / (rrf_k + rank) to an id's score"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -1,14 +1,27 @@
+import asyncio
+import os
 import sys
-import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
-from app.models.chat import ChatRequest, ChatResponse
+from app.config import settings
+from app.models.chat import BiasCheck, ChatRequest, ChatResponse, QueryAnalysis
+from app.services.conversation_memory import ConversationMemory, Turn
+from app.services.embeddings import get_embeddings
+from app.services.facets import extract_filters
+from app.services.intent_router import IntentRouter
+from app.services.response_cache import SemanticResponseCache
+from app.services.ingestion import ingestion_scheduler
+from app.utils.deadline import Deadline
 from app.utils.logger import logger
-from app.services.herkeyjob_service import scrape_herkey_jobs
-from app.services.naukrijob_service import scrape_naukri_jobs
-from app.services.herkeyevent_service import scrape_herkey_events
-from app.services.herkeymentor_service import scrape_herkey_mentorship
+from app.utils.metrics import CACHE_LOOKUPS, MOCK_FALLBACKS, REQUEST_SECONDS, span
 
 # Add the backend directory to sys.path
 current_dir = Path(__file__).resolve().parent
@@ -18,95 +31,102 @@ sys.path.append(str(backend_dir))
 # Initialize Gemini LLM
 llm = ChatGoogleGenerativeAI(
     model="gemini-2.0-flash",
-    api_key="os.getenv("GOOGLE_API_KEY")"  # Replace with your actual API key
+    api_key=os.getenv("GOOGLE_API_KEY")
 )
 
+# Schema-checked parsers for the combined bias + intent analysis and the bias-only check
+analysis_parser = PydanticOutputParser(pydantic_object=QueryAnalysis)
+bias_parser = PydanticOutputParser(pydantic_object=BiasCheck)
+
+CLARIFY_RESPONSE = "I can help you with job listings, events, mentorship programs, and general questions. Could you please clarify what you're looking for?"
+DEADLINE_RESPONSE = "I'm sorry, this is taking longer than expected. Please try again in a moment."
+
+@dataclass
+class PromptBuild:
+    """What a prompt was built from; replies to mock data or a filtered subset are not cached"""
+    mock_fallback: bool = False
+    filtered: bool = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not (self.mock_fallback or self.filtered)
+
+
+@dataclass
+class Resolution:
+    """Outcome of intent resolution for one query"""
+    intent: str
+    bias_check: Optional[BiasCheck] = None
+    prompt_task: Optional[asyncio.Task] = None
+    cached_response: Optional[str] = None
+    query_vector: Optional[np.ndarray] = None
+    build: PromptBuild = field(default_factory=PromptBuild)
+
+
 class ChatService:
     def __init__(self):
-        # In-memory context store (session_id -> list of {query, response})
-        self.session_context: Dict[str, list] = {}
-
-    async def process_message(self, chat_request: ChatRequest) -> ChatResponse:
-        # try:
-        # Step 1: Detect gender bias using LLM
-        print("inside chat service",chat_request)
-        bias_prompt = f"""
-        You must respond with ONLY a valid JSON object, with no additional text, markdown, or formatting.
-        Analyze this query for gender bias: "{chat_request.query}"
-        
-        Return your analysis in this exact JSON format:
-        {{"is_biased": false, "alternative_response": null}}
-        or
-        {{"is_biased": true, "alternative_response": "unbiased rephrasing here"}}
-        """
-        
-        # Get LLM response
-        bias_result = await llm.ainvoke(bias_prompt)
-        
-        # Log the raw response for debugging
-        logger.debug(f"Raw LLM response: {bias_result.content}")
-        
-        # Clean and parse the response
-        try:
-            content = bias_result.content.strip()
-            
-            # Remove any markdown formatting
-            if content.startswith('```'):
-                content = content.split('```')[1]
-                if content.startswith('json'):
-                    content = content[4:]
-            content = content.strip()
-            
-            # Ensure we have content to parse
-            if not content:
-                logger.warning("Received empty content from LLM")
-                bias_response = {
-                    "is_biased": False,
-                    "alternative_response": None
-                }
-            else:
-                # Try to parse JSON
-                bias_response = json.loads(content)
-                logger.debug(f"Successfully parsed JSON: {bias_response}")
-        
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON Parse Error. Content: '{content}'. Error: {str(e)}")
-            bias_response = {
-                "is_biased": False,
-                "alternative_response": None
-            }
-        
-        # Process the response
-        if bias_response.get("is_biased", False):
-            return ChatResponse(
-                response=bias_response.get("alternative_response", "I apologize, but I need to rephrase that in a more inclusive way."),
-                session_id=chat_request.session_id
+        # Recent turns per session, bounded and summarised as conversations grow
+        self.memory = ConversationMemory(
+            self._summarise if settings.conversation_summaries_enabled else None,
+            max_turns=settings.conversation_max_turns,
+            summarise_turns=settings.conversation_summarise_turns,
+            context_tokens=settings.conversation_context_tokens,
+            max_turn_chars=settings.conversation_max_turn_chars,
+            max_sessions=settings.conversation_max_sessions,
+            max_chars=settings.conversation_max_chars,
+            ttl_seconds=settings.session_timeout_minutes * 60
+        )
+        # Embedding intent router, built on first use because it loads the embedding model
+        self.intent_router: Optional[IntentRouter] = None
+        self.intent_router_lock = threading.Lock()
+        self.response_cache: Optional[SemanticResponseCache] = None
+        if settings.response_cache_mode in ("memory", "disk"):
+            self.response_cache = SemanticResponseCache(
+                threshold=settings.response_cache_threshold,
+                max_entries=settings.response_cache_max_entries,
+                ttl_seconds=settings.response_cache_ttl_seconds,
+                path=settings.response_cache_path if settings.response_cache_mode == "disk" else None
             )
 
-        # Handle the non-biased case with intent classification
-        intent_prompt = f"""
-        Return ONLY ONE of these exact words to classify the intent: 
-        job_listing, event, mentorship, faq, unknown
+    def warm_up(self):
+        """Builds the intent router up front instead of on the first chat request"""
+        if settings.intent_router_enabled:
+            self._get_intent_router()
 
-        Query: {chat_request.query}
-        """
-        
-        intent_result = await llm.ainvoke(intent_prompt)
-        intent = intent_result.content.strip().lower()
-        
-        # Get response based on intent
-        if intent == "job_listing":
-            response = await self._handle_job_request(chat_request.query, "")
-        elif intent == "event":
-            response = await self._handle_event_request(chat_request.query, "")
-        elif intent == "mentorship":
-            response = await self._handle_mentorship_request(chat_request.query, "")
-        elif intent == "faq":
-            response = await self._handle_faq_request(chat_request.query)
-        elif intent == "unknown":
-            response = await self._handle_general_request(chat_request.query)    
+    def _get_intent_router(self) -> IntentRouter:
+        """The intent router, built once even when the warm-up and a request race for it. Blocking."""
+        if self.intent_router is None:
+            with self.intent_router_lock:
+                if self.intent_router is None:
+                    self.intent_router = IntentRouter(get_embeddings())
+        return self.intent_router
+
+    async def process_message(self, chat_request: ChatRequest, deadline: Optional[Deadline] = None) -> ChatResponse:
+        # try:
+        logger.debug("Processing chat request: %s", chat_request)
+        start = time.perf_counter()
+        deadline = deadline or Deadline(settings.chat_deadline_seconds)
+        context = self.memory.context(chat_request.session_id)
+        resolution = await self._resolve_intent(chat_request.query, context, deadline)
+        if resolution.bias_check is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint="chat", intent=resolution.intent)
+            return self._biased_response(resolution.bias_check, chat_request.session_id)
+
+        if resolution.cached_response is not None:
+            response = resolution.cached_response
         else:
-            response = "I can help you with job listings, events, mentorship programs, and general questions. Could you please clarify what you're looking for?"
+            prompt = await self._await_prompt(resolution, chat_request.query, context, deadline)
+            if prompt:
+                with span("final_llm", intent=resolution.intent):
+                    response = await self._generate_by(prompt, deadline)
+            else:
+                response = CLARIFY_RESPONSE
+            if response is None:
+                response = DEADLINE_RESPONSE
+            else:
+                self._cache_response(resolution, chat_request.query, response)
+        self.memory.remember(chat_request.session_id, chat_request.query, response)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint="chat", intent=resolution.intent)
 
         return ChatResponse(
             response=response,
@@ -120,13 +140,322 @@ class ChatService:
         #         session_id=chat_request.session_id
         #     )
 
-    async def _handle_job_request(self, query: str, context: str) -> str:
+    async def stream_message(self, chat_request: ChatRequest, deadline: Optional[Deadline] = None) -> AsyncIterator[Dict]:
+        """
+        Streams the reply as events: one "intent" event once the intent is resolved,
+        "token" events as the LLM generates, then a "done" event with the full response.
+        The deadline bounds the whole stream: a reply cut short by it is sent as far as
+        it got, or as DEADLINE_RESPONSE if no token arrived, and is not cached.
+        """
+        start = time.perf_counter()
+        deadline = deadline or Deadline(settings.chat_deadline_seconds)
+        context = self.memory.context(chat_request.session_id)
+        resolution = await self._resolve_intent(chat_request.query, context, deadline)
+        yield {"event": "intent", "data": {
+            "intent": resolution.intent,
+            "is_biased": resolution.bias_check is not None,
+            "cached": resolution.cached_response is not None,
+            "session_id": chat_request.session_id
+        }}
+
+        if resolution.bias_check is not None:
+            response = self._biased_response(resolution.bias_check, chat_request.session_id).response
+            yield {"event": "token", "data": {"text": response}}
+        elif resolution.cached_response is not None:
+            response = resolution.cached_response
+            yield {"event": "token", "data": {"text": response}}
+        else:
+            prompt = await self._await_prompt(resolution, chat_request.query, context, deadline)
+            complete = True
+            if prompt:
+                chunks = []
+                stream = llm.astream(prompt).__aiter__()
+                # Includes the time the client takes to read each token
+                with span("final_llm_stream", intent=resolution.intent):
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(stream.__anext__(), deadline.timeout())
+                            except StopAsyncIteration:
+                                break
+                            except asyncio.TimeoutError:
+                                logger.warning("Streamed LLM reply ran past the request deadline")
+                                complete = False
+                                break
+                            if chunk.content:
+                                chunks.append(chunk.content)
+                                yield {"event": "token", "data": {"text": chunk.content}}
+                    finally:
+                        await stream.aclose()
+                response = "".join(chunks).strip()
+                if not chunks and not complete:
+                    response = DEADLINE_RESPONSE
+                    yield {"event": "token", "data": {"text": response}}
+            else:
+                response = CLARIFY_RESPONSE
+                yield {"event": "token", "data": {"text": response}}
+            if complete:
+                self._cache_response(resolution, chat_request.query, response)
+        if resolution.bias_check is None:
+            self.memory.remember(chat_request.session_id, chat_request.query, response)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint="chat_stream", intent=resolution.intent)
+
+        yield {"event": "done", "data": {
+            "response": response,
+            "session_id": chat_request.session_id,
+            "timestamp": datetime.now().isoformat()
+        }}
+
+    async def _resolve_intent(self, query: str, context: str = "", deadline: Optional[Deadline] = None) -> Resolution:
+        """
+        Resolves the intent of the query, screens it for gender bias and checks the
+        response cache. A prompt build may already be running when the bias check
+        was run alongside it.
+        """
+        query_vector = await self._embed_query(query)
+
+        # Step 1: Try to route the intent locally from the query embedding
+        route = await self._route_intent(query, query_vector)
+        if context:
+            # A reply that depends on earlier turns must not be shared with other sessions
+            query_vector = None
+
+        if route is None:
+            # Step 2a: Detect gender bias and classify intent in a single LLM call
+            analysis = await self._analyze_query(query, deadline)
+            if analysis.is_biased:
+                return Resolution(analysis.intent, bias_check=analysis)
+            return Resolution(
+                analysis.intent,
+                cached_response=self._cached_response(analysis.intent, query_vector),
+                query_vector=query_vector
+            )
+
+        intent, score = route
+        cached_response = self._cached_response(intent, query_vector)
+        if score >= settings.intent_router_exact_threshold:
+            # Step 2b: The query is one of our own vetted phrasings, no bias check needed
+            return Resolution(intent, cached_response=cached_response, query_vector=query_vector)
+
+        # Step 2c: Run the bias check alongside the prompt build instead of before it
+        bias_task = asyncio.create_task(self._check_bias(query, deadline))
+        prompt_task = None
+        build = PromptBuild()
+        if cached_response is None:
+            prompt_task = asyncio.create_task(self._build_prompt(intent, query, context, deadline, build))
+        try:
+            bias_check = await bias_task
+        except BaseException:
+            # Failed or cancelled: nobody would await the prompt build any more
+            if prompt_task:
+                prompt_task.cancel()
+            raise
+        if bias_check.is_biased:
+            if prompt_task:
+                prompt_task.cancel()
+            return Resolution(intent, bias_check=bias_check)
+        return Resolution(intent, prompt_task=prompt_task, cached_response=cached_response,
+                          query_vector=query_vector, build=build)
+
+    async def _await_prompt(self, resolution: Resolution, query: str, context: str = "",
+                            deadline: Optional[Deadline] = None) -> Optional[str]:
+        if resolution.prompt_task:
+            return await resolution.prompt_task
+        return await self._build_prompt(resolution.intent, query, context, deadline, resolution.build)
+
+    def _biased_response(self, bias_check: BiasCheck, session_id: str) -> ChatResponse:
+        return ChatResponse(
+            response=bias_check.alternative_response or "I apologize, but I need to rephrase that in a more inclusive way.",
+            session_id=session_id
+        )
+
+    def _cached_response(self, intent: str, query_vector: Optional[np.ndarray]) -> Optional[str]:
+        if self.response_cache is None or query_vector is None:
+            return None
+        response = self.response_cache.lookup(intent, query_vector)
+        CACHE_LOOKUPS.inc(intent=intent, result="miss" if response is None else "hit")
+        return response
+
+    def _cache_response(self, resolution: Resolution, query: str, response: str):
+        if self.response_cache is None or resolution.query_vector is None or not response:
+            return
+        if not resolution.build.cacheable:
+            # Filters are not part of the cache key, and mock data should not outlive the outage
+            return
+        self.response_cache.store(resolution.intent, query, resolution.query_vector, response)
+
+    async def _build_prompt(self, intent: str, query: str, context: str = "",
+                            deadline: Optional[Deadline] = None,
+                            build: Optional[PromptBuild] = None) -> Optional[str]:
+        # Listings have to be in before the time kept back for the final LLM call
+        scrape_deadline = (deadline or Deadline(None)).reserve(settings.chat_llm_reserve_seconds)
+        with span("prompt_build", intent=intent):
+            return await self._build_intent_prompt(intent, query, context, scrape_deadline, build or PromptBuild())
+
+    async def _build_intent_prompt(self, intent: str, query: str, context: str, deadline: Deadline,
+                                   build: PromptBuild) -> Optional[str]:
+        # Build the final prompt based on intent
+        if intent == "job_listing":
+            return await self._build_job_prompt(query, context, deadline, build)
+        elif intent == "event":
+            return await self._build_event_prompt(query, context, deadline, build)
+        elif intent == "mentorship":
+            return await self._build_mentorship_prompt(query, context, deadline, build)
+        elif intent == "faq":
+            return await self._build_faq_prompt(query, context)
+        elif intent == "unknown":
+            return await self._build_general_prompt(query, context)
+        return None
+
+    async def _generate(self, prompt: str) -> str:
+        # Call the LLM to generate the final response
+        result = await llm.ainvoke(prompt)
+        return result.content.strip()
+
+    async def _generate_by(self, prompt: str, deadline: Deadline) -> Optional[str]:
+        """The final response, or None when the LLM does not answer before the deadline"""
+        try:
+            return await asyncio.wait_for(self._generate(prompt), deadline.timeout())
+        except asyncio.TimeoutError:
+            logger.warning("Final LLM call ran past the request deadline")
+            return None
+
+    async def _summarise(self, summary: str, turns: List[Turn]) -> str:
+        """Folds older turns into the running summary of a conversation"""
+        turns_str = "\n".join(f"User: {turn.query}\nAssistant: {turn.response}" for turn in turns)
+        return await self._generate(f"""
+        Update the summary of a conversation between a user and Asha Bot with the turns below.
+        Keep what the user is looking for (roles, locations, skills, dates) and anything they were already shown.
+        Current summary: {summary or "None"}
+        New turns:
+        {turns_str}
+        Response: Only the updated summary, in at most 5 sentences.
+        """)
+
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Returns the normalised query embedding shared by the intent router and the
+        response cache, or None when neither is enabled or the model is unavailable.
+        """
+        if not settings.intent_router_enabled and self.response_cache is None:
+            return None
+        try:
+            embeddings = await asyncio.to_thread(get_embeddings)
+            with span("embed_query"):
+                vector = np.asarray(await asyncio.to_thread(embeddings.embed_query, query), dtype=np.float32)
+            return vector / max(float(np.linalg.norm(vector)), 1e-12)
+        except Exception as e:
+            logger.error(f"Query embedding failed: {str(e)}")
+            return None
+
+    async def _route_intent(self, query: str, query_vector: Optional[np.ndarray]) -> Optional[Tuple[str, float]]:
+        """
+        Returns (intent, similarity) from the embedding router, or None when the
+        router is disabled or not confident enough and the LLM should classify.
+        """
+        if not settings.intent_router_enabled or query_vector is None:
+            return None
+        try:
+            intent_router = self.intent_router or await asyncio.to_thread(self._get_intent_router)
+            with span("intent_router"):
+                intent, score = intent_router.route_embedding(query_vector)
+        except Exception as e:
+            logger.error(f"Intent router failed, falling back to LLM: {str(e)}")
+            return None
+
+        logger.debug(f"Intent router: {intent} ({score:.3f}) for query: {query}")
+        if score < settings.intent_router_threshold:
+            return None
+        return intent, score
+
+    async def _check_bias(self, query: str, deadline: Optional[Deadline] = None) -> BiasCheck:
+        """
+        Gender bias check on its own, used when the intent was routed locally.
+        A check the deadline cuts short counts as unbiased, like one that does not parse.
+        """
+        bias_prompt = f"""
+        Analyze this query for gender bias: "{query}"
+        If it contains gender bias, provide an unbiased rephrasing.
+
+        {bias_parser.get_format_instructions()}
+        Respond with ONLY the JSON object, with no additional text.
+        """
+
+        try:
+            with span("bias_llm"):
+                result = await asyncio.wait_for(llm.ainvoke(bias_prompt), (deadline or Deadline(None)).timeout())
+        except asyncio.TimeoutError:
+            logger.warning("Bias check ran past the request deadline")
+            return BiasCheck()
+        try:
+            return bias_parser.parse(result.content)
+        except OutputParserException as e:
+            logger.error(f"Bias check did not match schema. Content: '{result.content}'. Error: {str(e)}")
+            return BiasCheck()
+
+    async def _analyze_query(self, query: str, deadline: Optional[Deadline] = None) -> QueryAnalysis:
+        """
+        Runs the gender bias check and the intent classification as one LLM call.
+        The output is validated against the QueryAnalysis schema; anything that
+        does not parse, or does not arrive before the deadline, is treated as an
+        unbiased query with unknown intent.
+        """
+        analysis_prompt = f"""
+        Analyze this user query for a career assistant that helps women with jobs, events and mentorship.
+        Query: "{query}"
+
+        1. Decide whether the query contains gender bias. If it does, provide an unbiased rephrasing.
+        2. Classify the intent of the query as exactly one of:
+           job_listing, event, mentorship, faq, unknown
+
+        {analysis_parser.get_format_instructions()}
+        Respond with ONLY the JSON object, with no additional text.
+        """
+
+        # Bias check and intent classification share this one call
+        try:
+            with span("bias_intent_llm"):
+                result = await asyncio.wait_for(llm.ainvoke(analysis_prompt), (deadline or Deadline(None)).timeout())
+        except asyncio.TimeoutError:
+            logger.warning("Query analysis ran past the request deadline")
+            return QueryAnalysis()
+        logger.debug(f"Raw LLM analysis response: {result.content}")
+
+        try:
+            analysis = analysis_parser.parse(result.content)
+            logger.debug(f"Parsed query analysis: {analysis}")
+            return analysis
+        except OutputParserException as e:
+            logger.error(f"Query analysis did not match schema. Content: '{result.content}'. Error: {str(e)}")
+            return QueryAnalysis()
+
+    def _filter_listings(self, source: str, items: list, query: str, build: PromptBuild) -> list:
+        """
+        Narrows listings to the locations, skills, companies and dates the query
+        names, using the store's facet index. Falls back to every listing when
+        the query names none or nothing matches.
+        """
+        if not items:
+            return items
+        store = ingestion_scheduler.store
+        filters = extract_filters(query, store.facets(source))
+        if filters.is_empty():
+            return items
+        build.filtered = True
+        matched = store.filter(source, filters)
+        if not matched:
+            logger.info(f"No {source} listings match {filters.model_dump(exclude_defaults=True)}, showing all")
+            return items
+        return matched
+
+    async def _build_job_prompt(self, query: str, context: str, deadline: Deadline, build: PromptBuild) -> str:
+        # Read the listings the ingestion scheduler keeps pre-scraped
         if query.lower() == "show me current job from `naukri.com`":
-            jobs,url = scrape_naukri_jobs(search_query=query)
-        # Call the scrape_herkey_jobs function with the user's query
+            source = "naukri_jobs"
         else:
-            jobs,url = scrape_herkey_jobs(search_query=query)
-            print("jobs",jobs,url)
+            source = "herkey_jobs"
+        jobs,url = await ingestion_scheduler.listings(source, deadline)
+        jobs = self._filter_listings(source, jobs, query, build)
         # Validate the scraped jobs
         is_valid_output = (
             jobs and  # Check if the list is non-empty
@@ -143,7 +472,7 @@ class ChatService:
             jobs_str = "\n".join(
                 [
                     f"- {job.get('title', 'N/A')} at {job.get('company', 'N/A')} "
-                    f"(Location: {job.get('details', 'N/A')}, "
+                    f"(Location: {job.get('location', 'N/A')}, "
                     f"Skills: {job.get('skills', 'N/A')}, "
                     f"Salary: {job.get('salary', 'Not disclosed')}, "
                     f"Apply: {job.get('apply_url', 'N/A')})"
@@ -161,6 +490,8 @@ class ChatService:
             """
         else:
             # Handle invalid or empty output with a fallback prompt
+            MOCK_FALLBACKS.inc(intent="job_listing", source=source)
+            build.mock_fallback = True
             prompt = f"""
             Given the following user query and conversation context, generate a response as if you were retrieving job listings. No valid job listings were found, so provide a generic response with mock job data relevant to the query.
             Query: {query}
@@ -168,13 +499,11 @@ class ChatService:
             Response: Provide a concise list of mock job listings (2-3 examples) that align with the query. Include title, company, location, skills, salary, and a placeholder apply URL.
             """
 
-        # Call the LLM to generate the final response
-        result = await llm.ainvoke(prompt)
-        return result.content.strip()
+        return prompt
 
-    async def _handle_event_request(self, query: str, context: str) -> str:
-        # Call the scrape_herkey_events function with the user's query
-        events = scrape_herkey_events(search_query=query)
+    async def _build_event_prompt(self, query: str, context: str, deadline: Deadline, build: PromptBuild) -> str:
+        events, _ = await ingestion_scheduler.listings("herkey_events", deadline)
+        events = self._filter_listings("herkey_events", events, query, build)
 
         # Validate the scraped events
         is_valid_output = (
@@ -209,6 +538,8 @@ class ChatService:
             """
         else:
             # Handle invalid or empty output with a fallback prompt
+            MOCK_FALLBACKS.inc(intent="event", source="herkey_events")
+            build.mock_fallback = True
             prompt = f"""
             Given the following user query and conversation context, generate a response as if you were retrieving upcoming events. No valid event listings were found, so provide a generic response with mock event data relevant to the query.
             Query: {query}
@@ -216,13 +547,10 @@ class ChatService:
             Response: Provide a concise list of mock event listings (2-3 examples) that align with the query. Include title, date, location, description, and a placeholder register URL.
             """
 
-        # Call the LLM to generate the final response
-        result = await llm.ainvoke(prompt)
-        return result.content.strip()
+        return prompt
 
-    async def _handle_mentorship_request(self, query: str, context: str) -> str:
-        # Call the scrape_herkey_mentorship function
-        mentorships = scrape_herkey_mentorship(search_query="mentorship")
+    async def _build_mentorship_prompt(self, query: str, context: str, deadline: Deadline, build: PromptBuild) -> str:
+        mentorships, _ = await ingestion_scheduler.listings("herkey_mentorship", deadline)
 
         # Validate the scraped mentorships
         is_valid_output = (
@@ -256,6 +584,8 @@ class ChatService:
             """
         else:
             # Handle invalid or empty output with a fallback prompt
+            MOCK_FALLBACKS.inc(intent="mentorship", source="herkey_mentorship")
+            build.mock_fallback = True
             prompt = f"""
             Given the following user query and conversation context, generate a response as if you were retrieving mentorship opportunities. No valid mentorship opportunities were found, so provide a generic response with mock mentorship data relevant to the query.
             Query: {query}
@@ -263,25 +593,21 @@ class ChatService:
             Response: Provide a concise list of mock mentorship opportunities (2-3 examples) that align with the query. Include title, mentor name, description, and a placeholder register URL.
             """
 
-        # Call the LLM to generate the final response
-        result = await llm.ainvoke(prompt)
-        return result.content.strip()
+        return prompt
     
-    async def _handle_faq_request(self, query: str) -> str:
-        prompt = f"""
-        Given the following user query, generate a response as if you were answering a frequently asked question.
+    async def _build_faq_prompt(self, query: str, context: str = "") -> str:
+        return f"""
+        Given the following user query and conversation context, generate a response as if you were answering a frequently asked question.
         Query: {query}
+        Context: {context}
         Response: Provide a concise answer to the query.
         """
-        result = await llm.ainvoke(prompt)
-        return result.content.strip()
 
-    async def _handle_general_request(self, query: str) -> str:
-        prompt = f"""
-        Given the following user query, generate a response as if you were a helpful assistant.
+    async def _build_general_prompt(self, query: str, context: str = "") -> str:
+        return f"""
+        Given the following user query and conversation context, generate a response as if you were a helpful assistant.
         Query: {query}
+        Context: {context}
         Response: Provide a concise answer to the query.
         And remember that you are Asha Bot to help women with career development, job opportunities, and mentorship programs.
         """
-        result = await llm.ainvoke(prompt)
-        return result.content.strip()
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+from app.utils.logger import logger
+
+# Rough English average, good enough to keep prompts inside a budget
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class Turn:
+    query: str
+    response: str
+
+    @property
+    def size(self) -> int:
+        return len(self.query) + len(self.response)
+
+
+@dataclass
+class Conversation:
+    turns: Deque[Turn] = field(default_factory=deque)
+    summary: str = ""
+    last_active: float = field(default_factory=time.time)
+    summarising: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.summary) + sum(turn.size for turn in self.turns)
+
+
+def _tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ConversationMemory:
+    """
+    Recent turns of each chat session, for follow-up questions.
+
+    Each session keeps at most max_turns turns. When it is full, the oldest
+    summarise_turns are folded into a running summary by the summarise
+    callback, in the background, so the reply is never held up. Sessions idle
+    for longer than ttl_seconds are dropped, and the least recently used ones
+    are evicted once there are more than max_sessions or their text exceeds
+    max_chars in total.
+    """
+
+    def __init__(
+        self,
+        summarise: Optional[Callable[[str, List[Turn]], Awaitable[str]]],
+        max_turns: int,
+        summarise_turns: int,
+        context_tokens: int,
+        max_turn_chars: int,
+        max_sessions: int,
+        max_chars: int,
+        ttl_seconds: float
+    ):
+        self.summarise = summarise
+        self.max_turns = max_turns
+        self.summarise_turns = max(1, min(summarise_turns, max_turns))
+        self.context_tokens = context_tokens
+        self.max_turn_chars = max_turn_chars
+        self.max_sessions = max_sessions
+        self.max_chars = max_chars
+        self.ttl_seconds = ttl_seconds
+        self.sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.total_chars = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.summaries = 0
+        # Summaries being written; referenced here so they are not garbage collected mid-run
+        self.tasks: Set[asyncio.Task] = set()
+
+    def _expire(self, now: float):
+        # Sessions are kept in last-use order, so the idle ones are at the front
+        while self.sessions:
+            session_id, conversation = next(iter(self.sessions.items()))
+            if now - conversation.last_active <= self.ttl_seconds:
+                break
+            self._drop(session_id)
+            self.expirations += 1
+
+    def _drop(self, session_id: str):
+        conversation = self.sessions.pop(session_id)
+        self.total_chars -= conversation.size
+
+    def context(self, session_id: str) -> str:
+        """
+        The summary and as many of the latest turns as fit in context_tokens,
+        oldest first. Empty for a new or expired session.
+        """
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            conversation = self.sessions.get(session_id)
+            if conversation is None:
+                return ""
+            budget = self.context_tokens
+            parts: List[str] = []
+            for turn in reversed(conversation.turns):
+                text = f"User: {turn.query}\nAssistant: {turn.response}"
+                cost = _tokens(text)
+                if cost > budget:
+                    break
+                parts.append(text)
+                budget -= cost
+            if conversation.summary and _tokens(conversation.summary) <= budget:
+                parts.append(f"Summary of earlier conversation: {conversation.summary}")
+        return "\n".join(reversed(parts))
+
+    def remember(self, session_id: str, query: str, response: str):
+        """Records a turn; call from the event loop so summarisation can be scheduled"""
+        turn = Turn(query[:self.max_turn_chars], response[:self.max_turn_chars])
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            conversation = self.sessions.get(session_id)
+            if conversation is None:
+                conversation = self.sessions[session_id] = Conversation()
+            self.sessions.move_to_end(session_id)
+            conversation.last_active = now
+            conversation.turns.append(turn)
+            self.total_chars += turn.size
+
+            older = []
+            if len(conversation.turns) >= self.max_turns and not conversation.summarising:
+                if self.summarise:
+                    older = [conversation.turns[i] for i in range(self.summarise_turns)]
+                    conversation.summarising = True
+            # Hard bound even while a summary is still being written
+            while len(conversation.turns) > self.max_turns:
+                self.total_chars -= conversation.turns.popleft().size
+
+            while len(self.sessions) > self.max_sessions or (
+                self.total_chars > self.max_chars and len(self.sessions) > 1
+            ):
+                oldest = next(iter(self.sessions))
+                if oldest == session_id:
+                    break
+                self._drop(oldest)
+                self.evictions += 1
+
+        if older:
+            task = asyncio.create_task(self._summarise(session_id, conversation, older))
+            self.tasks.add(task)
+            task.add_done_callback(self._summary_done)
+
+    def _summary_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Summary task failed: {task.exception()!r}")
+
+    async def _summarise(self, session_id: str, conversation: Conversation, older: List[Turn]):
+        try:
+            summary = await self.summarise(conversation.summary, older)
+        except Exception as e:
+            logger.error(f"Error summarising conversation {session_id}: {e}")
+            summary = None
+
+        with self.lock:
+            conversation.summarising = False
+            if self.sessions.get(session_id) is not conversation:
+                return  # evicted meanwhile
+            before = conversation.size
+            if summary:
+                conversation.summary = summary[:self.max_turn_chars]
+                self.summaries += 1
+            # Drop the summarised turns unless the ring buffer already pushed them out;
+            # if summarising failed they go anyway, as the ring buffer would drop them
+            for turn in older:
+                if conversation.turns and conversation.turns[0] is turn:
+                    conversation.turns.popleft()
+            self.total_chars += conversation.size - before
+
+    def stats(self) -> Dict:
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "chars": self.total_chars,
+            "max_chars": self.max_chars,
+            "summaries": self.summaries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
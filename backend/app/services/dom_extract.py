@@ -0,0 +1,66 @@
+from typing import Dict, List, NamedTuple
+from selenium.webdriver.common.by import By
+from app.config import settings
+
+
+class Field(NamedTuple):
+    """Where to read one card field: the first element matching selector inside the card"""
+    selector: str
+    # "text" for the element's visible text, otherwise the attribute or property to read
+    attr: str = "text"
+    # Used when no element matches, or when the attribute is empty
+    default: str = "N/A"
+
+
+# Reads every card in one round trip. Properties are preferred over attributes
+# so links come back absolute, as WebElement.get_attribute returns them.
+EXTRACT_CARDS_JS = """
+const [cardSelector, fields] = arguments;
+return Array.from(document.querySelectorAll(cardSelector)).map(card => {
+    const data = {};
+    for (const [name, selector, attr, fallback] of fields) {
+        const element = card.querySelector(selector);
+        if (!element) {
+            data[name] = fallback;
+        } else if (attr === "text") {
+            data[name] = (element.innerText || "").trim();
+        } else {
+            const value = attr in element ? element[attr] : element.getAttribute(attr);
+            data[name] = value ? String(value) : fallback;
+        }
+    }
+    return data;
+});
+"""
+
+
+def _extract_with_script(driver, card_selector: str, fields: Dict[str, Field]) -> List[Dict[str, str]]:
+    spec = [[name, field.selector, field.attr, field.default] for name, field in fields.items()]
+    return driver.execute_script(EXTRACT_CARDS_JS, card_selector, spec) or []
+
+
+def _extract_with_webdriver(driver, card_selector: str, fields: Dict[str, Field]) -> List[Dict[str, str]]:
+    cards = []
+    for card in driver.find_elements(By.CSS_SELECTOR, card_selector):
+        data = {}
+        for name, field in fields.items():
+            elements = card.find_elements(By.CSS_SELECTOR, field.selector)
+            if not elements:
+                data[name] = field.default
+            elif field.attr == "text":
+                data[name] = elements[0].text.strip()
+            else:
+                data[name] = elements[0].get_attribute(field.attr) or field.default
+        cards.append(data)
+    return cards
+
+
+def extract_cards(driver, card_selector: str, fields: Dict[str, Field]) -> List[Dict[str, str]]:
+    """
+    Returns one dict per element matching card_selector with the given fields.
+    In "script" mode the whole page is read by a single injected extractor;
+    "webdriver" mode walks the cards with one WebDriver call per field.
+    """
+    if settings.scraper_extraction_mode == "webdriver":
+        return _extract_with_webdriver(driver, card_selector, fields)
+    return _extract_with_script(driver, card_selector, fields)
@@ -0,0 +1,223 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from app.config import settings
+from app.services.fast_load import apply_fast_load
+from app.utils.deadline import Deadline
+from app.utils.logger import logger
+
+# Longest a driver.get() may block; a borrower with a deadline gets less
+PAGE_LOAD_TIMEOUT_SECONDS = 60
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no driver becomes free within the acquire timeout"""
+
+
+def chrome_options() -> Options:
+    """Headless Chrome options shared by every scraper"""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.page_load_strategy = settings.scraper_page_load_strategy
+    # Network events from the DevTools Protocol, read by the scrapers' network-idle waits
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+
+@dataclass
+class PooledDriver:
+    driver: webdriver.Chrome
+    uses: int = 0
+
+
+class DriverPool:
+    """
+    Keeps up to `size` headless Chrome browsers alive and lends them to the
+    scrapers, so a scrape no longer pays the browser cold start.
+
+    A returned driver has its cookies, storage and extra tabs cleared before
+    the next borrower gets it. Drivers are quit and replaced after max_uses
+    borrows, or as soon as resetting them fails because the browser crashed.
+    """
+
+    def __init__(self, size: int, max_uses: int, acquire_timeout: float):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.cond = threading.Condition()
+        self.idle: List[PooledDriver] = []
+        self.borrowed: Dict[int, PooledDriver] = {}
+        # Drivers alive or being launched, idle and borrowed together
+        self.total = 0
+        self.launched = 0
+        self.recycled = 0
+        self.crashed = 0
+        self.waits = 0
+        self.closed = False
+
+    def _launch(self) -> PooledDriver:
+        start = time.perf_counter()
+        driver = webdriver.Chrome(options=chrome_options())
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+        # Blocked URLs only take effect with the Network domain enabled
+        driver.execute_cdp_cmd("Network.enable", {})
+        with self.cond:
+            self.launched += 1
+        logger.info(f"Launched headless Chrome in {time.perf_counter() - start:.1f}s")
+        return PooledDriver(driver)
+
+    def _reserve(self, timeout: float) -> Optional[PooledDriver]:
+        """Takes an idle driver, or returns None after reserving a slot to launch one"""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if self.idle:
+                    return self.idle.pop()
+                if self.total < self.size:
+                    self.total += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DriverPoolTimeout(f"No Chrome driver free after {timeout}s")
+                self.waits += 1
+                self.cond.wait(remaining)
+
+    def _discard(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting Chrome driver: {str(e)}")
+        with self.cond:
+            self.total -= 1
+            self.cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None, deadline: Optional[Deadline] = None,
+                source: Optional[str] = None) -> webdriver.Chrome:
+        """
+        Borrows a driver, launching one if the pool is not full yet. With a
+        deadline, neither the wait for a driver nor its page loads run past it.
+        The driver blocks the resources the source's fast-load profile excludes.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        pooled = self._reserve(timeout)
+        if pooled is None:
+            try:
+                pooled = self._launch()
+            except Exception:
+                with self.cond:
+                    self.total -= 1
+                    self.cond.notify()
+                raise
+        pooled.uses += 1
+        with self.cond:
+            self.borrowed[id(pooled.driver)] = pooled
+        if deadline is not None:
+            pooled.driver.set_page_load_timeout(max(deadline.cap(PAGE_LOAD_TIMEOUT_SECONDS), 1))
+        apply_fast_load(pooled.driver, source)
+        return pooled.driver
+
+    def release(self, driver: webdriver.Chrome):
+        """Returns a borrowed driver, resetting it or replacing it if it is worn out or broken"""
+        with self.cond:
+            pooled = self.borrowed.pop(id(driver), None)
+        if pooled is None:
+            return
+
+        if self.closed:
+            self._discard(pooled)
+            return
+        if pooled.uses >= self.max_uses:
+            with self.cond:
+                self.recycled += 1
+            self._discard(pooled)
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            logger.warning(f"Chrome driver failed to reset, replacing it: {str(e)}")
+            with self.cond:
+                self.crashed += 1
+            self._discard(pooled)
+            return
+
+        with self.cond:
+            self.idle.append(pooled)
+            self.cond.notify()
+
+    @staticmethod
+    def _reset(driver: webdriver.Chrome):
+        # Close every tab but the first, then wipe the state the last scrape left behind
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            # Pages that failed to load have no storage to clear
+            pass
+        driver.get("about:blank")
+
+    def warm(self):
+        """Pre-launches browsers until the pool is full"""
+        while True:
+            with self.cond:
+                if self.closed or self.total >= self.size:
+                    return
+                self.total += 1
+            try:
+                pooled = self._launch()
+            except Exception as e:
+                logger.error(f"Could not pre-launch Chrome driver: {str(e)}")
+                with self.cond:
+                    self.total -= 1
+                return
+            with self.cond:
+                self.idle.append(pooled)
+                self.cond.notify()
+
+    def stats(self) -> Dict:
+        with self.cond:
+            return {
+                "size": self.size,
+                "alive": self.total,
+                "idle": len(self.idle),
+                "in_use": len(self.borrowed),
+                "utilisation": len(self.borrowed) / self.size if self.size else 0.0,
+                "launched": self.launched,
+                "recycled": self.recycled,
+                "crashed": self.crashed,
+                "waits": self.waits,
+            }
+
+    def shutdown(self):
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+
+driver_pool = DriverPool(
+    size=settings.driver_pool_size,
+    max_uses=settings.driver_max_uses,
+    acquire_timeout=settings.driver_acquire_timeout_seconds
+)
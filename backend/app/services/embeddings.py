@@ -0,0 +1,22 @@
+import threading
+from typing import Optional
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from app.config import settings
+
+_embeddings: Optional[HuggingFaceEmbeddings] = None
+_lock = threading.Lock()
+
+
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """
+    Returns the process-wide sentence-transformers model.
+    Loaded once and shared by the RAG service and the chat intent router;
+    callers racing the first load (such as the warm-up and an early request)
+    wait for it instead of loading a second copy. Blocking.
+    """
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                _embeddings = HuggingFaceEmbeddings(model_name=settings.embedding_model_name)
+    return _embeddings
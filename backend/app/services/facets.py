@@ -0,0 +1,209 @@
+import os
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Set
+from app.models.retrieval import RetrievalFilters
+
+FACETS = ("source", "location", "skill", "company", "date")
+EMPTY_VALUES = {"", "n/a", "not disclosed"}
+
+# Spellings that should land on the same location value
+LOCATION_ALIASES = {
+    "bengaluru": "bangalore",
+    "gurugram": "gurgaon",
+    "bombay": "mumbai",
+    "new delhi": "delhi",
+    "work from home": "remote",
+    "wfh": "remote",
+}
+REMOTE_MARKERS = ("work from home", "remote")
+# Location placeholders that would otherwise match ordinary words in a query
+VAGUE_LOCATIONS = {"any", "anywhere"}
+
+MONTHS = {name: index for index, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+)}
+DAY_MONTH_YEAR = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3,9})\.?,?\s+(\d{4})\b")
+MONTH_DAY_YEAR = re.compile(r"\b([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b")
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+def _clean(value) -> Optional[str]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    value = " ".join(str(value).split()).lower()
+    return None if value in EMPTY_VALUES else value
+
+
+def source_name(source: str) -> str:
+    """"herkey_jobs.json" and "herkey_jobs" are the same source"""
+    return os.path.splitext(source)[0]
+
+
+def canonical_location(value: str) -> str:
+    value = value.strip().lower()
+    return LOCATION_ALIASES.get(value, value)
+
+
+def parse_date(value) -> Optional[date]:
+    """Reads "19 Oct 2025", "Oct 19, 2025" or "2025-10-19" out of free text"""
+    text = _clean(value)
+    if not text:
+        return None
+    try:
+        match = ISO_DATE.search(text)
+        if match:
+            return date(int(match[1]), int(match[2]), int(match[3]))
+        match = DAY_MONTH_YEAR.search(text)
+        if match and match[2][:3] in MONTHS:
+            return date(int(match[3]), MONTHS[match[2][:3]], int(match[1]))
+        match = MONTH_DAY_YEAR.search(text)
+        if match and match[1][:3] in MONTHS:
+            return date(int(match[3]), MONTHS[match[1][:3]], int(match[2]))
+    except ValueError:
+        pass
+    return None
+
+
+def _locations(value: str) -> Set[str]:
+    # Herkey "details" read "Pune | Work From Office | 5-10 Yr"; the city comes first
+    locations = {
+        canonical_location(part)
+        for part in re.split(r"[/,]", value.split("|")[0])
+        if part.strip() and part.strip() not in VAGUE_LOCATIONS
+    }
+    if any(marker in value for marker in REMOTE_MARKERS):
+        locations.add("remote")
+    return locations
+
+
+def _skills(value: str) -> Set[str]:
+    # "C# • Python +4": the "+4" counts skills the card did not show
+    skills = set()
+    for part in re.split(r"[•,;|]", value):
+        skill = re.sub(r"\s*\+\d+$", "", part).strip()
+        if skill and not skill.isdigit():
+            skills.add(skill)
+    return skills
+
+
+def entry_facets(entry: Dict, source: str) -> Dict[str, Set[str]]:
+    """Facet values of one listing, raw scraper output or normalised alike"""
+    facets = {facet: set() for facet in FACETS}
+    facets["source"].add(source_name(source))
+    if not isinstance(entry, dict):
+        return facets
+    for field in ("location", "details"):
+        value = _clean(entry.get(field))
+        if value:
+            facets["location"] |= _locations(value)
+    skills = _clean(entry.get("skills"))
+    if skills:
+        facets["skill"] |= _skills(skills)
+    company = _clean(entry.get("company"))
+    if company:
+        facets["company"].add(company.rstrip(". "))
+    event_date = parse_date(entry.get("date"))
+    if event_date:
+        facets["date"].add(event_date.isoformat())
+    return facets
+
+
+class FacetIndex:
+    """
+    Inverted index from facet value to the keys (document ids or list
+    positions) that carry it, so a filter resolves to a candidate set with a
+    few set operations instead of a scan over every listing.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, Dict[str, Set[Hashable]]] = {facet: defaultdict(set) for facet in FACETS}
+
+    def add(self, key: Hashable, facets: Dict[str, Set[str]]):
+        for facet, values in facets.items():
+            for value in values:
+                self.index[facet][value].add(key)
+
+    def vocabulary(self, facet: str) -> List[str]:
+        return list(self.index[facet])
+
+    def _any_of(self, facet: str, values: List[str]) -> Set[Hashable]:
+        keys = set()
+        for value in values:
+            keys |= self.index[facet].get(value, set())
+        return keys
+
+    def match(self, filters: Optional[RetrievalFilters]) -> Optional[Set[Hashable]]:
+        """Keys matching every facet in filters, or None when there is nothing to filter on"""
+        if filters is None or filters.is_empty():
+            return None
+        selections = []
+        if filters.sources:
+            selections.append(self._any_of("source", [source_name(value) for value in filters.sources]))
+        if filters.locations:
+            selections.append(self._any_of("location", [canonical_location(value) for value in filters.locations]))
+        if filters.skills:
+            selections.append(self._any_of("skill", [value.strip().lower() for value in filters.skills]))
+        if filters.companies:
+            selections.append(self._any_of("company", [value.strip().lower() for value in filters.companies]))
+        if filters.date_from or filters.date_to:
+            # ISO dates compare correctly as strings
+            start = filters.date_from.isoformat() if filters.date_from else ""
+            end = filters.date_to.isoformat() if filters.date_to else "9999-12-31"
+            selections.append(self._any_of("date", [day for day in self.index["date"] if start <= day <= end]))
+        return set.intersection(*selections)
+
+
+def _mentions(query: str, value: str) -> bool:
+    return re.search(rf"(?<![a-z0-9]){re.escape(value)}(?![a-z0-9])", query) is not None
+
+
+def _date_range(query: str, today: date):
+    if "today" in query:
+        return today, today
+    if "tomorrow" in query:
+        tomorrow = today + timedelta(days=1)
+        return tomorrow, tomorrow
+    if "this weekend" in query:
+        sunday = today + timedelta(days=6 - today.weekday())
+        return max(today, sunday - timedelta(days=1)), sunday
+    if "next week" in query:
+        monday = today + timedelta(days=7 - today.weekday())
+        return monday, monday + timedelta(days=6)
+    if "this week" in query:
+        return today, today + timedelta(days=6 - today.weekday())
+    if "next month" in query:
+        first = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        return first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if "this month" in query:
+        return today, (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return None, None
+
+
+def extract_filters(query: str, index: FacetIndex, today: Optional[date] = None) -> RetrievalFilters:
+    """
+    Picks the locations, skills and companies a query names, matched against
+    the values the index actually holds, plus a date range for phrases such
+    as "this week". Sources are left to the caller.
+    """
+    query = " ".join(query.lower().split())
+    locations = {value for value in index.vocabulary("location") if _mentions(query, value)}
+    locations |= {
+        canonical for alias, canonical in LOCATION_ALIASES.items()
+        if _mentions(query, alias) and canonical in index.index["location"]
+    }
+    # Very short skills ("go", "r") match ordinary words, unless they carry a symbol like "c#"
+    skills = [
+        value for value in index.vocabulary("skill")
+        if (len(value) > 2 or not value.isalnum()) and _mentions(query, value)
+    ]
+    companies = [value for value in index.vocabulary("company") if len(value) > 2 and _mentions(query, value)]
+    date_from, date_to = _date_range(query, today or datetime.now().date())
+    return RetrievalFilters(
+        locations=sorted(locations),
+        skills=skills,
+        companies=companies,
+        date_from=date_from,
+        date_to=date_to,
+    )
@@ -0,0 +1,45 @@
+from typing import List, Optional
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("scrapers.fast_load")
+
+# URL patterns (Network.setBlockedURLs wildcards) per kind of resource the
+# extractors never read. The trailing * lets query strings through the match.
+RESOURCE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*", "*.bmp*"],
+    "media": ["*.mp4*", "*.webm*", "*.ogg*", "*.mp3*", "*.wav*", "*.m3u8*", "*.mpd*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "stylesheet": ["*.css*"],
+    "tracker": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.*",
+        "*facebook.net*", "*connect.facebook.*", "*snap.licdn.com*", "*px.ads.linkedin.com*",
+        "*hotjar.com*", "*clarity.ms*", "*segment.io*", "*mixpanel.com*", "*amplitude.com*",
+        "*nr-data.net*", "*newrelic.com*", "*sentry.io*", "*branch.io*",
+        "*moengage.com*", "*clevertap*", "*webengage*",
+    ],
+}
+
+
+def blocked_urls(source: Optional[str]) -> List[str]:
+    """The URL patterns to block while scraping source, minus what it allow-lists"""
+    if not settings.scraper_fast_load:
+        return []
+    allowed = set(settings.scraper_fast_load_allow.get(source or "", []))
+    urls = []
+    for kind in settings.scraper_fast_load_block:
+        if kind not in allowed:
+            urls.extend(RESOURCE_PATTERNS.get(kind, []))
+    return urls
+
+
+def apply_fast_load(driver, source: Optional[str]):
+    """
+    Sets the blocked URLs of a pooled driver for its next borrower. Always
+    called, so one source's profile never carries over to another.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls(source)})
+    except Exception as e:
+        logger.warning(f"Could not apply the fast-load profile for {source}: {str(e)}")
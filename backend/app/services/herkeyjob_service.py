@@ -5,100 +5,94 @@ from pathlib import Path
 current_dir = Path(__file__).resolve().parent
 backend_dir = current_dir.parent.parent
 sys.path.append(str(backend_dir))
-import json
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from typing import Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
+from app.services.dom_extract import Field, extract_cards
+from app.services.driver_pool import driver_pool
+from app.services.page_waits import PageWaiter
+from app.utils.deadline import Deadline
+from app.utils.logger import get_logger
+from app.utils.metrics import StageTimer
+
+logger = get_logger("scrapers.herkey_jobs")
+
+JOB_CARD_SELECTOR = "[data-test-id='job-details']"
+JOB_FIELDS = {
+    'title': Field("[data-test-id='job-title']"),
+    'company': Field("[data-test-id='company-name']"),
+    # Location and details
+    'details': Field("p[class*='capitalize css-y9sg3k']"),
+    'skills': Field("span[class*='capitalize css-2wpeo8']"),
+    # Apply URL from the Apply button
+    'apply_url': Field("[data-test-id='apply-job']", "href"),
+}
 
-def scrape_herkey_jobs(search_query):
+def scrape_herkey_jobs(search_query, deadline: Optional[Deadline] = None):
     """
     Scrapes job listings from Herkey jobs page using Selenium for dynamic content.
     Simulates a search query to trigger job listings.
     Returns a list of dictionaries containing job details.
+    Waits are cut short by the deadline, if one is given.
     """
     url="https://www.herkey.com/jobs"
+    deadline = deadline or Deadline(None)
     jobs_list = []
     driver = None
-    print("scraping herkey jobs",search_query)
+    logger.info("Scraping herkey jobs for %r", search_query)
+    stages = StageTimer("herkey_jobs")
     try:
-        # Set up Selenium with headless Chrome
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-        driver = webdriver.Chrome(options=chrome_options)
+        # Borrow a warm headless Chrome from the shared pool
+        driver = driver_pool.acquire(deadline=deadline, source="herkey_jobs")
+        waits = PageWaiter(driver, "herkey_jobs", deadline)
+        stages.mark("driver_start")
         
         # Navigate to URL
         driver.get(url)
+        stages.mark("page_load")
         
         # Interact with the search bar
         try:
-            search_bar = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[class*='search'], input[type='text'], [class*='MuiInputBase-input']"))
+            search_bar = waits.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[class*='search'], input[type='text'], [class*='MuiInputBase-input']")),
+                "search_bar", 10
             )
             search_bar.send_keys(search_query)
             search_bar.send_keys(Keys.RETURN)
-            print(f"Performed search for: {search_query}")
+            logger.info(f"Performed search for: {search_query}")
         except TimeoutException:
-            print("Search bar not found or not interactable. Proceeding without search.")
+            logger.warning("Search bar not found or not interactable. Proceeding without search.")
+        stages.mark("search")
 
         # Wait for job listings to load
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-test-id='job-details']"))
-            )
+            waits.until(EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR)), "job_cards", 20)
         except TimeoutException:
-            print("Timeout: Job listings did not load within 20 seconds.")
+            logger.warning("Timeout: Job listings did not load within 20 seconds.")
             with open('herkey_page_source.html', 'w', encoding='utf-8') as f:
                 f.write(driver.page_source)
-            print("Saved page source to 'herkey_page_source.html' for debugging.")
-            return []
+            logger.info("Saved page source to 'herkey_page_source.html' for debugging.")
+            return [],url
 
         # Scroll to load more jobs (handle lazy loading)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)  # Wait for potential lazy-loaded content
+        waits.cards_settled(JOB_CARD_SELECTOR, timeout=2)  # Until lazy-loaded cards stop appearing
+        stages.mark("wait")
 
-        # Find job listing containers
-        job_elements = driver.find_elements(By.CSS_SELECTOR, "[data-test-id='job-details']")
+        # Read every job card in one pass
+        job_cards = extract_cards(driver, JOB_CARD_SELECTOR, JOB_FIELDS)
+        stages.mark("extract")
 
-        if not job_elements:
-            print("No job elements found. Check if jobs require additional filters or login.")
+        if not job_cards:
+            logger.warning("No job elements found. Check if jobs require additional filters or login.")
             with open('herkey_page_source.html', 'w', encoding='utf-8') as f:
                 f.write(driver.page_source)
-            print("Saved page source to 'herkey_page_source.html' for debugging.")
+            logger.info("Saved page source to 'herkey_page_source.html' for debugging.")
         
-        for job in job_elements:
-            job_data = {}
-            
-            # Extract job title
-            title_elem = job.find_elements(By.CSS_SELECTOR, "[data-test-id='job-title']")
-            job_data['title'] = title_elem[0].text.strip() if title_elem else 'N/A'
-            
-            # Extract company name
-            company_elem = job.find_elements(By.CSS_SELECTOR, "[data-test-id='company-name']")
-            job_data['company'] = company_elem[0].text.strip() if company_elem else 'N/A'
-            
-            # Extract location and details
-            details_elem = job.find_elements(By.CSS_SELECTOR, "p[class*='capitalize css-y9sg3k']")
-            job_data['details'] = details_elem[0].text.strip() if details_elem else 'N/A'
-            
-            # Extract skills
-            skills_elem = job.find_elements(By.CSS_SELECTOR, "span[class*='capitalize css-2wpeo8']")
-            job_data['skills'] = skills_elem[0].text.strip() if skills_elem else 'N/A'
-            
-            # Extract apply URL (from the Apply button)
-            apply_button = job.find_elements(By.CSS_SELECTOR, "[data-test-id='apply-job']")
-            job_data['apply_url'] = apply_button[0].get_attribute('href') if apply_button and apply_button[0].get_attribute('href') else 'N/A'
-            
-            # Extract salary (not explicitly present in HTML, so default to 'Not disclosed')
+        for job_data in job_cards:
+            # Salary is not present in the HTML, so default to 'Not disclosed'
             job_data['salary'] = 'Not disclosed'
             
             # Only add job if at least some data is present
@@ -110,12 +104,12 @@ def scrape_herkey_jobs(search_query):
             json.dump(jobs_list, f, indent=4, ensure_ascii=False)
         
     except WebDriverException as e:
-        print(f"Error with WebDriver: {e}")
+        logger.error(f"Error with WebDriver: {e}")
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.error(f"Unexpected error: {e}")
     finally:
         if driver:
-            driver.quit()
+            driver_pool.release(driver)
     
     return jobs_list,url
 
@@ -0,0 +1,263 @@
+import asyncio
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.herkeyevent_service import scrape_herkey_events
+from app.services.herkeyjob_service import scrape_herkey_jobs
+from app.services.herkeymentor_service import scrape_herkey_mentorship
+from app.services.naukrijob_service import scrape_naukri_jobs
+from app.services.scrape_pool import scrape_pool
+from app.storage.listing_store import ListingStore
+from app.utils.deadline import Deadline
+from app.utils.logger import logger
+
+
+def _text(value, default: str = "N/A") -> str:
+    text = str(value).strip() if value is not None else ""
+    return text or default
+
+
+def normalise_job(job: Dict) -> Dict:
+    """Maps Herkey and Naukri job fields onto one schema"""
+    return {
+        "title": _text(job.get("title")),
+        "company": _text(job.get("company")),
+        # Herkey puts location, work mode and experience together in "details"
+        "location": _text(job.get("location") or job.get("details")),
+        "skills": _text(job.get("skills")),
+        "salary": _text(job.get("salary"), "Not disclosed"),
+        "experience": _text(job.get("experience")),
+        "apply_url": _text(job.get("apply_url") or job.get("link")),
+    }
+
+
+def normalise_event(event: Dict) -> Dict:
+    return {
+        "title": _text(event.get("title")),
+        "date": _text(event.get("date")),
+        "location": _text(event.get("location")),
+        "description": _text(event.get("description")),
+        "url": _text(event.get("url")),
+    }
+
+
+def normalise_mentorship(mentor: Dict) -> Dict:
+    return {
+        "title": _text(mentor.get("title")),
+        "mentor_name": _text(mentor.get("mentor_name")),
+        "description": _text(mentor.get("description")),
+        "url": _text(mentor.get("url")),
+    }
+
+
+# Seconds a deadline-bound scrape may overrun while it wraps up with partial results
+PARTIAL_GRACE_SECONDS = 3.0
+
+
+@dataclass
+class Source:
+    name: str
+    scraper: Callable
+    normalise: Callable[[Dict], Dict]
+    url: str
+
+
+@dataclass
+class SourceStatus:
+    source: str
+    interval_seconds: int
+    running: bool = False
+    last_refresh: Optional[str] = None
+    last_duration_seconds: Optional[float] = None
+    item_count: int = 0
+    last_error: Optional[str] = None
+    next_refresh: Optional[str] = None
+    refreshes: int = 0
+    failures: int = 0
+
+
+SOURCES: Dict[str, Source] = {
+    source.name: source for source in [
+        Source("herkey_jobs", scrape_herkey_jobs, normalise_job, "https://www.herkey.com/jobs"),
+        Source("naukri_jobs", scrape_naukri_jobs, normalise_job, "https://www.naukri.com/"),
+        Source("herkey_events", scrape_herkey_events, normalise_event, "https://events.herkey.com/events"),
+        Source("herkey_mentorship", scrape_herkey_mentorship, normalise_mentorship, "https://www.herkey.com/search"),
+    ]
+}
+
+
+class IngestionScheduler:
+    """
+    Periodically re-scrapes every source in the background and keeps the
+    normalised listings in a ListingStore, so chat handlers read listings
+    instead of scraping inside the request.
+
+    Each source refreshes every interval, give or take the configured jitter
+    so the sources drift apart instead of all hitting the scrape pool at once.
+    Refreshes are single-flight: a refresh requested while one is already
+    running for the same source waits for that one instead of starting another.
+    Shared refreshes never run under a chat request's deadline, so a scrape
+    cut short for one request is never stored as a full refresh.
+    """
+
+    def __init__(self, store: ListingStore, sources: Dict[str, Source]):
+        self.store = store
+        self.sources = sources
+        self.status: Dict[str, SourceStatus] = {
+            name: SourceStatus(name, self._interval(name)) for name in sources
+        }
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.loops: List[asyncio.Task] = []
+
+    @staticmethod
+    def _interval(name: str) -> int:
+        return settings.ingestion_intervals_seconds.get(name, 60 * 60)
+
+    def _next_delay(self, name: str) -> float:
+        interval = self._interval(name)
+        return max(interval * (1 + random.uniform(-settings.ingestion_jitter, settings.ingestion_jitter)), 1.0)
+
+    @property
+    def running(self) -> bool:
+        return bool(self.loops)
+
+    def start(self):
+        if self.loops:
+            return
+        for name in self.sources:
+            self.loops.append(asyncio.create_task(self._run(name)))
+        logger.info(f"Ingestion scheduler started for {len(self.sources)} sources")
+
+    async def stop(self):
+        for task in self.loops + list(self.inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self.loops, *self.inflight.values(), return_exceptions=True)
+        self.loops = []
+
+    async def _run(self, name: str):
+        # Sources refreshed within their interval before a restart wait out the remainder
+        fetched_at = self.store.fetched_at(name)
+        delay = 0.0
+        if fetched_at is not None:
+            delay = max(fetched_at + self._interval(name) - time.time(), 0.0)
+        while True:
+            self.status[name].next_refresh = datetime.fromtimestamp(time.time() + delay).isoformat()
+            await asyncio.sleep(delay)
+            await self.refresh(name)
+            delay = self._next_delay(name)
+
+    def _start_refresh(self, name: str) -> asyncio.Task:
+        task = self.inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._refresh(self.sources[name]))
+            self.inflight[name] = task
+            task.add_done_callback(lambda _: self.inflight.pop(name, None))
+        return task
+
+    async def refresh(self, name: str) -> SourceStatus:
+        """Refreshes a source now, joining the refresh already in flight if there is one"""
+        # Shielded so a cancelled caller does not cancel a refresh others are waiting on
+        return await asyncio.shield(self._start_refresh(name))
+
+    async def _scrape(self, source: Source, deadline: Optional[Deadline] = None,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        """Runs the scraper of a source on the scrape pool and returns its normalised, deduplicated listings"""
+        result = await scrape_pool.run(
+            source.scraper,
+            source=source.name,
+            search_query=settings.ingestion_queries.get(source.name, ""),
+            deadline=deadline,
+            timeout=timeout
+        )
+        # Job scrapers return (jobs, url), the others just the list
+        items = result[0] if isinstance(result, tuple) else result
+        normalised = []
+        for item in items or []:
+            listing = source.normalise(item)
+            if listing not in normalised:
+                normalised.append(listing)
+        return normalised
+
+    async def _refresh(self, source: Source) -> SourceStatus:
+        status = self.status[source.name]
+        status.running = True
+        start = time.perf_counter()
+        try:
+            normalised = await self._scrape(source, timeout=settings.ingestion_timeout_seconds)
+
+            # Scrapers swallow their own errors and return nothing, so an empty
+            # result never replaces listings we already have
+            if normalised or self.store.get(source.name) is None:
+                await asyncio.to_thread(self.store.replace, source.name, normalised, source.url)
+                status.item_count = len(normalised)
+                status.last_error = None
+            else:
+                status.item_count = len(self.store.get(source.name))
+                status.last_error = f"Scrape returned no items, kept {status.item_count} stored listings"
+                status.failures += 1
+        except Exception as e:
+            status.last_error = str(e) or type(e).__name__
+            status.failures += 1
+            logger.error(f"Ingestion of {source.name} failed: {status.last_error}")
+        finally:
+            status.running = False
+            status.refreshes += 1
+            status.last_refresh = datetime.now().isoformat()
+            status.last_duration_seconds = round(time.perf_counter() - start, 3)
+
+        logger.info(f"Ingested {status.item_count} listings from {source.name} in {status.last_duration_seconds}s")
+        return status
+
+    async def listings(self, name: str, deadline: Optional[Deadline] = None) -> Tuple[List[Dict], str]:
+        """
+        Returns the stored listings of a source and its page URL. Only when the
+        source has never been ingested, or is stale while the scheduler is not
+        running, is it fetched on demand, within the chat scrape timeout and the
+        request deadline:
+
+        - a shared refresh already in flight is waited for until the deadline;
+        - otherwise the caller runs its own scrape under its deadline, gets the
+          listings it got to, and a full refresh is started in the background.
+          Those listings are stored only if there are none yet, marked stale.
+        """
+        source = self.sources[name]
+        fetched_at = self.store.fetched_at(name)
+        stale = fetched_at is None or time.time() - fetched_at > self._interval(name)
+        if fetched_at is not None and not (stale and not self.running):
+            return self.store.get(name) or [], source.url
+
+        deadline = deadline or Deadline(None)
+        # The scraper checks the deadline between steps, so it gets a few
+        # seconds past it to finish the step it is on and hand back its listings
+        timeout = min(settings.scrape_timeout_seconds, deadline.remaining() + PARTIAL_GRACE_SECONDS)
+        task = self.inflight.get(name)
+        if task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Refresh of {name} did not finish within the request deadline")
+            return self.store.get(name) or [], source.url
+
+        self._start_refresh(name)
+        try:
+            partial = await self._scrape(source, deadline, timeout)
+        except Exception as e:
+            logger.warning(f"On-demand scrape of {name} failed: {str(e) or type(e).__name__}")
+            return self.store.get(name) or [], source.url
+        if partial and self.store.get(name) is None:
+            await asyncio.to_thread(self.store.replace, name, partial, source.url, True)
+        return partial or self.store.get(name) or [], source.url
+
+    def stats(self) -> Dict:
+        for name, status in self.status.items():
+            status.item_count = len(self.store.get(name) or [])
+        return {
+            "running": self.running,
+            "sources": [asdict(status) for status in self.status.values()],
+        }
+
+
+ingestion_scheduler = IngestionScheduler(ListingStore(), SOURCES)
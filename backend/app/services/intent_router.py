@@ -0,0 +1,87 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from app.utils.logger import logger
+
+# Prototype phrasings for each intent. The first entries of each list are the
+# quick-action queries sent by the Streamlit frontend, which make up most traffic.
+INTENT_PROTOTYPES: Dict[str, List[str]] = {
+    "job_listing": [
+        "Show me current job from `naukri.com`",
+        "Show me current job from `herkey.com`",
+        "Show me the latest job openings",
+        "Find software engineer jobs in Bangalore",
+        "Are there any remote jobs available?",
+        "I am looking for a job in data science",
+        "Job opportunities for women returning to work after a career break",
+        "Which companies are hiring right now?",
+    ],
+    "event": [
+        "What events are coming up?",
+        "List the sessions happening this week",
+        "Are there any workshops or webinars this month?",
+        "Show me upcoming career events",
+        "When is the next networking event?",
+    ],
+    "mentorship": [
+        "Are there any mentorship programs available?",
+        "I want to find a mentor",
+        "How can I connect with a mentor in tech?",
+        "Show me mentorship opportunities for women",
+        "Can someone mentor me on my career growth?",
+    ],
+    "faq": [
+        "How do I create an account?",
+        "How do I reset my password?",
+        "How can I update my resume on my profile?",
+        "How do I apply for a job through Herkey?",
+        "Is this service free to use?",
+    ],
+    "unknown": [
+        "What is Asha Bot?",
+        "Share success stories of women in leadership",
+        "Tell me the latest updates on women empowerment from Internet",
+        "Hello, how are you?",
+        "How can I negotiate a better salary?",
+    ],
+}
+
+
+class IntentRouter:
+    """
+    Routes a query to an intent by cosine similarity against precomputed
+    prototype embeddings, without an LLM round trip.
+    """
+
+    def __init__(self, embeddings, prototypes: Dict[str, List[str]] = INTENT_PROTOTYPES):
+        self.embeddings = embeddings
+        self.intents = list(prototypes.keys())
+
+        texts = []
+        offsets = []
+        for intent in self.intents:
+            offsets.append(len(texts))
+            texts.extend(prototypes[intent])
+        # Prototypes are stored contiguously per intent; offsets mark where each group starts
+        self.offsets = np.asarray(offsets)
+        self.matrix = self._normalize(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        logger.info(f"Intent router ready with {len(texts)} prototypes for {len(self.intents)} intents")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def embed(self, query: str) -> np.ndarray:
+        """Returns the L2-normalised embedding of the query"""
+        return self._normalize(np.asarray(self.embeddings.embed_query(query), dtype=np.float32))
+
+    def route_embedding(self, query_vector: np.ndarray) -> Tuple[str, float]:
+        """Returns the best matching intent and its cosine similarity for a normalised query vector"""
+        scores = self.matrix @ query_vector
+        # Best prototype score per intent in a single vectorised reduction
+        intent_scores = np.maximum.reduceat(scores, self.offsets)
+        best = int(np.argmax(intent_scores))
+        return self.intents[best], float(intent_scores[best])
+
+    def route(self, query: str) -> Tuple[str, float]:
+        return self.route_embedding(self.embed(query))
@@ -1,14 +1,34 @@
 import json
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from typing import Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
+from app.services.dom_extract import Field, extract_cards
+from app.services.driver_pool import driver_pool
+from app.services.page_waits import PageWaiter
+from app.utils.deadline import Deadline
+from app.utils.logger import get_logger
+from app.utils.metrics import StageTimer
 
-def scrape_naukri_jobs(search_query):
+logger = get_logger("scrapers.naukri_jobs")
+
+# Rough time one more results page takes: navigation, listing wait and lazy-load settling
+PAGE_SECONDS = 10
+
+JOB_CARD_SELECTOR = "article.jobTuple, div.jobTuple, div.srp-jobtuple-wrapper"
+JOB_FIELDS = {
+    'title': Field("a.title, a.job-title, .jobTupleHeader a"),
+    'company': Field("a.subTitle, .company-name, .subTitle a"),
+    'location': Field(".location, .loc-info, .job-location"),
+    'salary': Field(".salary, .sal-info, .salary-info", default='Not disclosed'),
+    'experience': Field(".experience, .exp-info, .exp"),
+    'skills': Field(".tags, .skills, .key-skills"),
+    # Apply URL
+    'link': Field("a.title, a.job-title, .jobTupleHeader a", "href"),
+}
+
+def scrape_naukri_jobs(search_query, deadline: Optional[Deadline] = None):
     """
     Scrapes job listings from Naukri.com using Selenium in headless mode for background execution.
     Simulates a search query and handles pagination to fetch job details across multiple pages.
@@ -18,151 +38,118 @@ def scrape_naukri_jobs(search_query):
         url (str): Base URL of Naukri.com
         search_query (str): Search term (e.g., "software engineer")
         max_pages (int): Maximum number of pages to scrape
+        deadline (Deadline): Time budget of the request; pagination stops once
+            another page would not fit and the jobs found so far are returned
     """
     url="https://www.naukri.com/"
     max_pages=2
+    deadline = deadline or Deadline(None)
     jobs_list = []
     driver = None
+    stages = StageTimer("naukri_jobs")
     
     try:
-        # Set up Selenium with headless Chrome
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")  # Run in headless mode
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-extensions")  # Disable extensions for performance
-        chrome_options.add_argument("--disable-images")  # Optional: Disable images to reduce load
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.set_page_load_timeout(60)
+        # Borrow a warm headless Chrome from the shared pool
+        driver = driver_pool.acquire(deadline=deadline, source="naukri_jobs")
+        waits = PageWaiter(driver, "naukri_jobs", deadline)
+        stages.mark("driver_start")
         
         # Navigate to URL
-        print(f"Navigating to {url}")
-        driver.get(url)
-        time.sleep(5)  # Wait for page to load
+        logger.debug(f"Navigating to {url}")
+        driver.get(url)  # Returns at DOMContentLoaded under the eager load strategy
+        stages.mark("page_load")
         
-        print("Page title:", driver.title)
+        logger.debug("Page title: %s", driver.title)
         # Save screenshot (optional, for debugging; headless mode still supports this)
         # driver.save_screenshot("naukri_debug.png")
         
         # Interact with the search bar
         try:
-            search_bar = WebDriverWait(driver, 15).until(
+            search_bar = waits.until(
                 EC.presence_of_element_located((
                     By.CSS_SELECTOR, 
                     "input.sugInp, input[keyword], input[placeholder*='skills'], input[id*='qsb-keyword']"
-                ))
+                )),
+                "search_bar", 15
             )
             search_bar.clear()
             search_bar.send_keys(search_query)
             search_bar.send_keys(Keys.RETURN)
-            print(f"Performed search for: {search_query}")
-            time.sleep(5)  # Allow search results to load
+            logger.info(f"Performed search for: {search_query}")
+            waits.network_idle(timeout=5)  # Until the search results have been fetched
         except TimeoutException:
-            print("Search bar not found or not interactable. Proceeding without search.")
+            logger.warning("Search bar not found or not interactable. Proceeding without search.")
+        stages.mark("search")
         
         # Process job listings across pages
         page_count = 0
         while page_count < max_pages:
             # Wait for job listings to load
             try:
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((
-                        By.CSS_SELECTOR, 
-                        "article.jobTuple, div.jobTuple, div.srp-jobtuple-wrapper"
-                    ))
-                )
+                waits.until(EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR)), "job_cards", 20)
             except TimeoutException:
-                print(f"Timeout: Job listings did not load on page {page_count + 1}.")
+                logger.warning(f"Timeout: Job listings did not load on page {page_count + 1}.")
                 with open('naukri_page_source.html', 'w', encoding='utf-8') as f:
                     f.write(driver.page_source)
-                print("Saved page source to 'naukri_page_source.html' for debugging.")
+                logger.info("Saved page source to 'naukri_page_source.html' for debugging.")
                 break
             
             # Scroll to load more jobs (handle lazy loading)
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)  # Wait for lazy-loaded content
+            waits.cards_settled(JOB_CARD_SELECTOR, timeout=3)  # Until lazy-loaded cards stop appearing
+            stages.mark("wait")
             
-            # Find job listing containers
-            job_elements = driver.find_elements(
-                By.CSS_SELECTOR, 
-                "article.jobTuple, div.jobTuple, div.srp-jobtuple-wrapper"
-            )
+            # Read every job card on the page in one pass
+            job_cards = extract_cards(driver, JOB_CARD_SELECTOR, JOB_FIELDS)
+            stages.mark("extract")
             
-            if not job_elements:
-                print(f"No job elements found on page {page_count + 1}. Check if jobs require filters or login.")
+            if not job_cards:
+                logger.warning(f"No job elements found on page {page_count + 1}. Check if jobs require filters or login.")
                 with open('naukri_page_source.html', 'w', encoding='utf-8') as f:
                     f.write(driver.page_source)
-                print("Saved page source to 'naukri_page_source.html' for debugging.")
+                logger.info("Saved page source to 'naukri_page_source.html' for debugging.")
                 break
             
-            for job in job_elements:
-                job_data = {}
-                
-                # Extract job title
-                title_elem = job.find_elements(By.CSS_SELECTOR, "a.title, a.job-title, .jobTupleHeader a")
-                job_data['title'] = title_elem[0].text.strip() if title_elem else 'N/A'
-                
-                # Extract company name
-                company_elem = job.find_elements(By.CSS_SELECTOR, "a.subTitle, .company-name, .subTitle a")
-                job_data['company'] = company_elem[0].text.strip() if company_elem else 'N/A'
-                
-                # Extract location
-                location_elem = job.find_elements(By.CSS_SELECTOR, ".location, .loc-info, .job-location")
-                job_data['location'] = location_elem[0].text.strip() if location_elem else 'N/A'
-                
-                # Extract salary
-                salary_elem = job.find_elements(By.CSS_SELECTOR, ".salary, .sal-info, .salary-info")
-                job_data['salary'] = salary_elem[0].text.strip() if salary_elem else 'Not disclosed'
-                
-                # Extract experience
-                exp_elem = job.find_elements(By.CSS_SELECTOR, ".experience, .exp-info, .exp")
-                job_data['experience'] = exp_elem[0].text.strip() if exp_elem else 'N/A'
-                
-                # Extract skills
-                skills_elem = job.find_elements(By.CSS_SELECTOR, ".tags, .skills, .key-skills")
-                job_data['skills'] = skills_elem[0].text.strip() if skills_elem else 'N/A'
-                
-                # Extract apply URL
-                link_elem = job.find_elements(By.CSS_SELECTOR, "a.title, a.job-title, .jobTupleHeader a")
-                job_data['link'] = link_elem[0].get_attribute('href') if link_elem and link_elem[0].get_attribute('href') else 'N/A'
-                
+            for job_data in job_cards:
                 # Only add job if at least some data is present
                 if any(value != 'N/A' and value != 'Not disclosed' for value in job_data.values()):
                     jobs_list.append(job_data)
             
-            # Move to the next page
+            # Move to the next page, unless it would not fit in the time left
+            if page_count + 1 < max_pages and not deadline.has(PAGE_SECONDS):
+                logger.info(f"Deadline near, stopping after page {page_count + 1} with {len(jobs_list)} jobs")
+                break
             try:
                 next_button = driver.find_element(By.CSS_SELECTOR, "a.fright.fs14.btn-secondary.br2, .pagination a.next")
                 if next_button.is_enabled() and next_button.is_displayed():
+                    first_card = driver.find_element(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
                     next_button.click()
-                    print(f"Moving to page {page_count + 2}")
-                    time.sleep(5)  # Wait for next page to load
+                    logger.debug(f"Moving to page {page_count + 2}")
+                    # Wait for the old cards to be replaced and the new page's requests to finish
+                    waits.settled(EC.staleness_of(first_card), "page_change", 5)
+                    waits.network_idle(timeout=5)
+                    stages.mark("page_load")
                     page_count += 1
                 else:
-                    print("Next button disabled or not found. Stopping pagination.")
+                    logger.info("Next button disabled or not found. Stopping pagination.")
                     break
             except:
-                print("No more pages available.")
+                logger.info("No more pages available.")
                 break
         
         # Save to JSON file
         with open('data/naukri_jobs.json', 'w', encoding='utf-8') as f:
             json.dump(jobs_list, f, indent=4, ensure_ascii=False)
         
-        print(f"Scraped {len(jobs_list)} jobs across {page_count + 1} page(s)")
+        logger.info(f"Scraped {len(jobs_list)} jobs across {page_count + 1} page(s)")
         
     except WebDriverException as e:
-        print(f"Error with WebDriver: {e}")
+        logger.error(f"Error with WebDriver: {e}")
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.error(f"Unexpected error: {e}")
     finally:
         if driver:
-            driver.quit()
+            driver_pool.release(driver)
     
     return jobs_list,url
 
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
+from app.utils.deadline import Deadline
+from app.utils.logger import get_logger
+from app.utils.metrics import SCRAPER_BLOCKED_REQUESTS, SCRAPER_BYTES, SCRAPER_WAIT_SECONDS
+
+logger = get_logger("scrapers.waits")
+
+# Poll interval bounds; within them the interval follows how fast a source's pages respond
+MIN_POLL_SECONDS = 0.05
+MAX_POLL_SECONDS = 0.5
+DEFAULT_POLL_SECONDS = 0.1
+# The network counts as idle once no request has started or finished for this
+# long and at most this many are still open (long polls and sockets never finish)
+NETWORK_QUIET_SECONDS = 0.5
+NETWORK_IDLE_MAX_INFLIGHT = 2
+# Cards count as loaded once their number has not changed for this long
+CARDS_QUIET_SECONDS = 0.5
+
+CARD_COUNT_JS = "return document.querySelectorAll(arguments[0]).length"
+RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length"
+REQUEST_STARTED = "Network.requestWillBeSent"
+REQUEST_ENDED = {"Network.loadingFinished", "Network.loadingFailed"}
+
+
+class PageSpeed:
+    """
+    Moving average of how long waits take per source. Sources whose pages
+    settle quickly are polled often; slow ones less, to save round trips.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.averages: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, source: str, seconds: float):
+        with self.lock:
+            average = self.averages.get(source)
+            self.averages[source] = seconds if average is None else average + self.alpha * (seconds - average)
+
+    def poll_interval(self, source: str) -> float:
+        with self.lock:
+            average = self.averages.get(source)
+        if average is None:
+            return DEFAULT_POLL_SECONDS
+        return min(max(average / 20, MIN_POLL_SECONDS), MAX_POLL_SECONDS)
+
+
+page_speed = PageSpeed()
+
+
+class PageWaiter:
+    """
+    Condition-based waits for one scrape: instead of sleeping a fixed time,
+    each wait polls until the page is in the state the next step needs, and
+    records how long that took. Every timeout is capped by the deadline.
+
+    Network idleness is read from the Chrome DevTools Protocol network events
+    in the performance log (see chrome_options); if that log is unavailable,
+    the number of resource timing entries settling is used instead.
+    """
+
+    def __init__(self, driver, source: str, deadline: Optional[Deadline] = None):
+        self.driver = driver
+        self.source = source
+        self.deadline = deadline or Deadline(None)
+        self.inflight: Set[str] = set()
+        self.cdp = True
+        # Drop events left over from the page the driver showed before
+        self._network_events(count=False)
+        self.inflight.clear()
+
+    def _record(self, name: str, start: float, outcome: str):
+        seconds = time.perf_counter() - start
+        SCRAPER_WAIT_SECONDS.observe(seconds, source=self.source, wait=name, outcome=outcome)
+        if outcome == "met":
+            page_speed.observe(self.source, seconds)
+        logger.debug(f"{self.source} wait {name}: {outcome} after {seconds:.2f}s")
+
+    def until(self, condition: Callable, name: str, timeout: float):
+        """
+        Like WebDriverWait.until: returns the first truthy value of condition(driver),
+        or raises TimeoutException. The poll interval adapts to the source.
+        """
+        timeout = self.deadline.cap(timeout)
+        poll = page_speed.poll_interval(self.source)
+        start = time.perf_counter()
+        end = start + timeout
+        while True:
+            try:
+                value = condition(self.driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                value = None
+            if value:
+                self._record(name, start, "met")
+                return value
+            now = time.perf_counter()
+            if now >= end:
+                self._record(name, start, "timeout")
+                raise TimeoutException(f"{name} not met within {timeout:.1f}s")
+            time.sleep(min(poll, end - now))
+
+    def settled(self, condition: Callable, name: str, timeout: float) -> bool:
+        """A best-effort wait: False on timeout instead of raising"""
+        try:
+            self.until(condition, name, timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    def cards_settled(self, selector: str, timeout: float = 5, quiet: float = CARDS_QUIET_SECONDS) -> bool:
+        """Waits until at least one card matches and their number stops growing"""
+        state = {"count": -1, "since": time.perf_counter()}
+
+        def settled(driver):
+            count = driver.execute_script(CARD_COUNT_JS, selector)
+            now = time.perf_counter()
+            if count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return count > 0 and now - state["since"] >= quiet
+
+        return self.settled(settled, "cards_settled", timeout)
+
+    def _network_events(self, count: bool = True) -> Optional[int]:
+        """
+        Drains the CDP network events logged since the last call into the set of
+        open requests, counting downloaded bytes and blocked requests on the way.
+        Returns how many events there were, or None without the log.
+        """
+        if not self.cdp:
+            return None
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            self.cdp = False
+            return None
+        downloaded = blocked = 0
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == REQUEST_STARTED:
+                self.inflight.add(params["requestId"])
+            elif method in REQUEST_ENDED:
+                self.inflight.discard(params["requestId"])
+                downloaded += params.get("encodedDataLength", 0)
+                if params.get("blockedReason"):
+                    blocked += 1
+        if count and downloaded:
+            SCRAPER_BYTES.inc(downloaded, source=self.source)
+        if count and blocked:
+            SCRAPER_BLOCKED_REQUESTS.inc(blocked, source=self.source)
+        return len(entries)
+
+    def network_idle(self, timeout: float = 10, quiet: float = NETWORK_QUIET_SECONDS) -> bool:
+        """Waits until the page's network traffic has been quiet for `quiet` seconds"""
+        state = {"resources": -1, "since": time.perf_counter()}
+
+        def idle(driver):
+            now = time.perf_counter()
+            events = self._network_events()
+            if events is None:
+                # No performance log: watch the resource timing buffer instead
+                resources = driver.execute_script(RESOURCE_COUNT_JS)
+                busy = resources != state["resources"]
+                state["resources"] = resources
+            else:
+                busy = events > 0 or len(self.inflight) > NETWORK_IDLE_MAX_INFLIGHT
+            if busy:
+                state["since"] = now
+                return False
+            return now - state["since"] >= quiet
+
+        return self.settled(idle, "network_idle", timeout)
@@ -1,84 +1,228 @@
 import os
 import json
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import hashlib
+from typing import Dict, List, Optional
 from langchain.docstore.document import Document
+from app.config import settings
+from app.models.retrieval import RetrievalFilters
+from app.services.bm25 import BM25Index, reciprocal_rank_fusion
+from app.services.embeddings import get_embeddings
+from app.services.facets import FacetIndex, entry_facets
+from app.services.vector_backends import BACKEND_DIR, create_vector_backend
+from app.utils.batching import MicroBatcher
+from app.utils.logger import get_logger
+
+logger = get_logger("rag")
+
+# Data files owned by other stores rather than knowledge for retrieval
+EXCLUDED_FILES = {"listings.json", "feedback.json", "sessions.json", "session_details.json"}
+
+# Fields that carry meaning for retrieval, in the order they are written into
+# a document. Any other scalar fields follow them; links go to metadata only.
+DOCUMENT_FIELDS = [
+    "title", "company", "location", "details", "skills", "experience", "salary",
+    "date", "mentor_name", "description", "question", "answer",
+]
+LINK_FIELDS = ["apply_url", "link", "url"]
+EMPTY_VALUES = {"", "N/A", "Not disclosed"}
+
+
+def entry_to_document(entry, source: str) -> Optional[Document]:
+    """
+    Builds a document from the meaningful fields of a JSON entry as
+    "Field: value" lines, instead of embedding the JSON syntax itself.
+    Returns None for entries with nothing but placeholders.
+    """
+    if not isinstance(entry, dict):
+        return Document(page_content=json.dumps(entry, ensure_ascii=False), metadata={"source": source})
+
+    fields = [field for field in DOCUMENT_FIELDS if field in entry]
+    fields += [field for field in entry if field not in DOCUMENT_FIELDS and field not in LINK_FIELDS]
+    lines = []
+    for field in fields:
+        value = entry[field]
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False)
+        value = str(value).strip() if value is not None else ""
+        if value not in EMPTY_VALUES:
+            lines.append(f"{field.replace('_', ' ').capitalize()}: {value}")
+    if not lines:
+        return None
+
+    metadata = {"source": source}
+    for field in LINK_FIELDS:
+        link = entry.get(field)
+        if link and str(link) not in EMPTY_VALUES:
+            metadata["url"] = str(link)
+            break
+    return Document(page_content="\n".join(lines), metadata=metadata)
+
+
+def document_id(document: Document) -> str:
+    """Content hash of a document, so unchanged entries keep their id across restarts"""
+    key = f"{document.metadata.get('source', '')}\n{document.page_content}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class HybridRetriever:
+    """
+    Ranks documents by dense similarity from the vector backend and by BM25
+    over the same texts, and merges the two rankings with reciprocal-rank fusion.
+    Questions with filters are first narrowed to the documents the facet
+    index allows, and both rankings only look at that subset.
+    """
+
+    def __init__(self, vector_store, documents: Dict[str, Document], facets: Optional[FacetIndex] = None):
+        self.vector_store = vector_store
+        self.documents = documents
+        self.facets = facets or FacetIndex()
+        self.ids = list(documents)
+        self.positions = {doc_id: index for index, doc_id in enumerate(self.ids)}
+        self.bm25 = BM25Index([documents[doc_id].page_content for doc_id in self.ids])
+
+    def search_batch(
+        self,
+        questions: List[str],
+        k: int,
+        mode: str = "hybrid",
+        filters: Optional[List[Optional[RetrievalFilters]]] = None
+    ) -> List[List[Document]]:
+        """
+        Top k documents per question; mode is "hybrid" or "dense". filters, if
+        given, holds one entry per question. Blocking.
+        """
+        if not self.ids:
+            return [[] for _ in questions]
+
+        allowed = [self.facets.match(f) for f in filters] if filters else [None] * len(questions)
+        candidates = min(max(k, settings.rag_candidate_k), len(self.ids))
+        vectors = get_embeddings().embed_documents(questions)
+
+        # Unfiltered questions still share one backend call
+        dense: List[List[str]] = [[] for _ in questions]
+        unfiltered = [i for i, subset in enumerate(allowed) if subset is None]
+        if unfiltered:
+            for i, ids in zip(unfiltered, self.vector_store.search([vectors[i] for i in unfiltered], candidates)):
+                dense[i] = ids
+        for i, subset in enumerate(allowed):
+            if subset:
+                dense[i] = self.vector_store.search_subset(vectors[i], min(candidates, len(subset)), list(subset))
+
+        results = []
+        for question, dense_ids, subset in zip(questions, dense, allowed):
+            if subset is not None and not subset:
+                results.append([])
+                continue
+            ranked = dense_ids
+            if mode == "hybrid":
+                positions = {self.positions[doc_id] for doc_id in subset} if subset is not None else None
+                sparse_ids = [self.ids[index] for index, _ in self.bm25.search(question, candidates, positions)]
+                ranked = reciprocal_rank_fusion([dense_ids, sparse_ids], settings.rag_rrf_k)
+            results.append([self.documents[doc_id] for doc_id in ranked[:k] if doc_id in self.documents])
+        return results
 
 
 class RAGService:
     def __init__(self):
         self.vector_store = None
+        self.retriever: Optional[HybridRetriever] = None
+        self.facets = FacetIndex()
         self._initialize_vector_store()
+        # Concurrent queries are embedded in one forward pass and searched in one backend call
+        self.batcher = MicroBatcher(
+            self._query_items,
+            window_seconds=settings.rag_batch_window_ms / 1000,
+            max_size=settings.rag_batch_max_size
+        )
 
     def _load_json_files(self):
-        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        data_folder = os.path.join(backend_dir, "data")
-        print(f"Looking for data in: {data_folder}")
+        data_folder = os.path.join(BACKEND_DIR, "data")
+        logger.info(f"Looking for data in: {data_folder}")
 
         if not os.path.exists(data_folder):
             raise FileNotFoundError(f"Data folder not found at: {data_folder}")
 
         documents = []
         for filename in os.listdir(data_folder):
-            if filename.endswith(".json"):
+            if filename.endswith(".json") and filename not in EXCLUDED_FILES:
                 file_path = os.path.join(data_folder, filename)
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
                         content = f.read().strip()
                         if not content:
-                            print(f"Skipping empty file: {filename}")
+                            logger.debug(f"Skipping empty file: {filename}")
                             continue
                         json_data = json.loads(content)
-                        if isinstance(json_data, list):
-                            for entry in json_data:
-                                doc_text = json.dumps(entry, ensure_ascii=False, indent=2)
-                                documents.append(Document(page_content=doc_text, metadata={"source": filename}))
-                        else:
-                            doc_text = json.dumps(json_data, ensure_ascii=False, indent=2)
-                            documents.append(Document(page_content=doc_text, metadata={"source": filename}))
-                        print(f"Successfully loaded: {filename}")
+                        entries = json_data if isinstance(json_data, list) else [json_data]
+                        for entry in entries:
+                            document = entry_to_document(entry, filename)
+                            if document:
+                                documents.append((document, entry_facets(entry, filename)))
+                        logger.debug(f"Successfully loaded: {filename}")
                 except json.JSONDecodeError as e:
-                    print(f"Skipping {filename} due to invalid JSON: {e}")
+                    logger.warning(f"Skipping {filename} due to invalid JSON: {e}")
                 except Exception as e:
-                    print(f"Error processing {filename}: {e}")
+                    logger.error(f"Error processing {filename}: {e}")
 
         if not documents:
-            print("Warning: No valid JSON documents were loaded")
+            logger.warning("No valid JSON documents were loaded")
             return None
 
         return documents
 
-    def _create_vector_store(self, documents):
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        vector_store = Chroma.from_documents(documents, embeddings, persist_directory="./chroma_db")
-        return vector_store
-
     def _initialize_vector_store(self):
-        documents = self._load_json_files()
-        if documents:
-            self.vector_store = self._create_vector_store(documents)
+        documents = {}
+        for document, facets in self._load_json_files() or []:
+            doc_id = document_id(document)
+            if doc_id not in documents:
+                documents[doc_id] = document
+                self.facets.add(doc_id, facets)
+        # Only new or changed documents are embedded; see the backend for how
+        self.vector_store = create_vector_backend()
+        self.vector_store.sync(documents)
+        self.retriever = HybridRetriever(self.vector_store, documents, self.facets)
+
+    @staticmethod
+    def _answer(document: Document) -> str:
+        url = document.metadata.get("url")
+        return f"{document.page_content}\nLink: {url}" if url else document.page_content
 
-    def query(self, question: str) -> str:
+    def query_batch(self, questions: list, filters: Optional[list] = None) -> list:
         """
-        Query the vector store. Returns the content of the most relevant document if found, otherwise returns "none".
+        Returns the content of the rag_top_k most relevant documents for each
+        question, or "none" when nothing is found. filters optionally holds a
+        RetrievalFilters (or None) per question. Blocking; run it off the event loop.
         """
-        if not self.vector_store:
-            print("Vector store not initialized or no documents loaded")
-            return "none"
+        if not self.retriever:
+            logger.warning("Vector store not initialized or no documents loaded")
+            return ["none"] * len(questions)
 
         try:
-            # Retrieve relevant documents from the vector store
-            retriever = self.vector_store.as_retriever(search_kwargs={"k": 1})  # Get only the most relevant document
-            retrieved_docs = retriever.invoke(question)
+            results = self.retriever.search_batch(
+                questions, settings.rag_top_k, settings.rag_retrieval_mode, filters
+            )
+        except Exception as e:
+            logger.error(f"Error querying vector store: {e}")
+            return ["none"] * len(questions)
 
-            # If no relevant documents are found, return "none"
-            if not retrieved_docs:
-                print(f"No relevant documents found for question: {question}")
-                return "none"
+        answers = []
+        for question, documents in zip(questions, results):
+            if not documents:
+                logger.debug(f"No relevant documents found for question: {question}")
+                answers.append("none")
+            else:
+                answers.append("\n\n".join(self._answer(document) for document in documents))
+        return answers
 
-            # Return the content of the most relevant document
-            return retrieved_docs[0].page_content
+    def _query_items(self, items: list) -> list:
+        return self.query_batch([question for question, _ in items], [filters for _, filters in items])
 
-        except Exception as e:
-            print(f"Error querying vector store: {e}")
-            return "none"
\ No newline at end of file
+    def query(self, question: str, filters: Optional[RetrievalFilters] = None) -> str:
+        """
+        Query the vector store. Returns the content of the most relevant document if found, otherwise returns "none".
+        """
+        return self.query_batch([question], [filters])[0]
+
+    async def aquery(self, question: str, filters: Optional[RetrievalFilters] = None) -> str:
+        """Like query, but batched with other concurrent callers and run off the event loop"""
+        return await self.batcher.submit((question, filters))
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+from app.utils.logger import logger
+
+
+@dataclass
+class ComponentState:
+    name: str
+    state: str = "pending"  # pending, warming, ready or failed
+    error: Optional[str] = None
+    warmup_seconds: Optional[float] = None
+
+
+class Readiness:
+    """
+    Tracks the background warm-up of the components that are too slow to
+    build while uvicorn is starting, so /health can answer straight away and
+    /ready reports what is still loading.
+    """
+
+    def __init__(self, components: List[str]):
+        self.components: Dict[str, ComponentState] = {name: ComponentState(name) for name in components}
+
+    def is_ready(self, name: str) -> bool:
+        return self.components[name].state == "ready"
+
+    @property
+    def all_ready(self) -> bool:
+        return all(component.state == "ready" for component in self.components.values())
+
+    async def warm(self, name: str, fn: Callable, *args):
+        """Runs the blocking warm-up fn in a thread and records how it went"""
+        component = self.components[name]
+        component.state = "warming"
+        start = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            component.state = "failed"
+            component.error = str(e)
+            logger.error(f"Warm-up of {name} failed: {e}")
+            return None
+        finally:
+            component.warmup_seconds = round(time.perf_counter() - start, 3)
+        component.state = "ready"
+        logger.info(f"{name} ready in {component.warmup_seconds}s")
+        return result
+
+    def snapshot(self) -> Dict:
+        return {
+            "ready": self.all_ready,
+            "components": {name: asdict(component) for name, component in self.components.items()},
+        }
+
+
+readiness = Readiness(["embeddings", "vector_store", "chat", "scrapers"])
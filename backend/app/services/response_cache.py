@@ -0,0 +1,249 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.logger import logger
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    intent: str
+    query: str
+    embedding: np.ndarray
+    response: str
+    created_at: float
+
+
+class EmbeddingMatrix:
+    """
+    The embeddings of one intent's entries as the rows of a preallocated
+    matrix, grown by doubling, so a lookup is one matrix-vector product.
+    A removed row is filled with the last one to keep the rows contiguous.
+    """
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.created_at = np.zeros(capacity, dtype=np.float64)
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, vector: np.ndarray, created_at: float):
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.vectors):
+                self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+                self.created_at = np.concatenate([self.created_at, np.zeros_like(self.created_at)])
+            self.keys.append(key)
+            self.rows[key] = row
+        self.vectors[row] = vector
+        self.created_at[row] = created_at
+
+    def remove(self, key: str):
+        row = self.rows.pop(key)
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.vectors[row] = self.vectors[last]
+            self.created_at[row] = self.created_at[last]
+            self.keys[row] = moved
+            self.rows[moved] = row
+        self.keys.pop()
+
+    def expired(self, now: float, ttl: float) -> List[str]:
+        rows = np.flatnonzero(now - self.created_at[:len(self.keys)] > ttl)
+        return [self.keys[row] for row in rows]
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        return self.vectors[:len(self.keys)] @ vector
+
+
+class SemanticResponseCache:
+    """
+    Reuses a recent chat response when a new query's embedding is within the
+    similarity threshold of a cached query with the same intent.
+
+    Entries expire after a per-intent TTL and are evicted least recently used
+    first once max_entries is reached. With a path, entries are written behind
+    to SQLite by a background thread and reloaded on start so the cache
+    survives restarts; lookups and stores never wait on the disk. The last
+    writes before a crash may be lost, which a cache can afford.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: Dict[str, int],
+                 path: Optional[str] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.matrices: Dict[str, EmbeddingMatrix] = {}
+        self.lock = threading.Lock()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.evictions = 0
+        self.expirations = 0
+
+        self.db = None
+        if path:
+            db_path = Path(path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    intent TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self.db.commit()
+            self._load()
+            self.writes: "queue.Queue[Tuple[str, tuple]]" = queue.Queue()
+            threading.Thread(target=self._write_behind, name="response-cache-writer", daemon=True).start()
+
+    def _ttl(self, intent: str) -> int:
+        return self.ttl_seconds.get(intent, 0)
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self._ttl(entry.intent)
+
+    def _load(self):
+        now = time.time()
+        rows = self.db.execute(
+            "SELECT key, intent, query, embedding, response, created_at FROM response_cache "
+            "ORDER BY last_used DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        # Rows come most recently used first; insert oldest first to rebuild the LRU order
+        for key, intent, query, embedding, response, created_at in reversed(rows):
+            entry = CacheEntry(key, intent, query, np.frombuffer(embedding, dtype=np.float32),
+                               response, created_at)
+            if not self._is_expired(entry, now):
+                self._add(entry)
+        self.db.execute(
+            "DELETE FROM response_cache WHERE key NOT IN (%s)" % ",".join("?" * len(self.entries)),
+            list(self.entries.keys())
+        )
+        self.db.commit()
+        logger.info(f"Loaded {len(self.entries)} cached responses from disk")
+
+    def _write(self, sql: str, params: tuple):
+        if self.db:
+            self.writes.put((sql, params))
+
+    def _write_behind(self):
+        # Commits whatever has queued up since the last commit as one transaction
+        while True:
+            batch = [self.writes.get()]
+            while True:
+                try:
+                    batch.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.db:
+                    for sql, params in batch:
+                        self.db.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing {len(batch)} response cache changes: {e}")
+            finally:
+                for _ in batch:
+                    self.writes.task_done()
+
+    def flush(self):
+        """Blocks until every queued write is on disk"""
+        if self.db:
+            self.writes.join()
+
+    def _add(self, entry: CacheEntry):
+        self.entries[entry.key] = entry
+        self.entries.move_to_end(entry.key)
+        matrix = self.matrices.get(entry.intent)
+        if matrix is None:
+            matrix = self.matrices[entry.intent] = EmbeddingMatrix(len(entry.embedding))
+        matrix.add(entry.key, entry.embedding, entry.created_at)
+
+    def _delete(self, key: str):
+        entry = self.entries.pop(key)
+        self.matrices[entry.intent].remove(key)
+        self._write("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def lookup(self, intent: str, embedding: np.ndarray) -> Optional[str]:
+        """Returns the cached response closest to the normalised query embedding, if any"""
+        if self._ttl(intent) <= 0:
+            return None
+
+        now = time.time()
+        with self.lock:
+            matrix = self.matrices.get(intent)
+            best = None
+            if matrix is not None:
+                for key in matrix.expired(now, self._ttl(intent)):
+                    self._delete(key)
+                    self.expirations += 1
+                if len(matrix):
+                    scores = matrix.scores(embedding)
+                    index = int(np.argmax(scores))
+                    if scores[index] >= self.threshold:
+                        best = self.entries[matrix.keys[index]]
+
+            if best is None:
+                self.misses[intent] += 1
+                return None
+
+            self.hits[intent] += 1
+            self.entries.move_to_end(best.key)
+            self._write("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, best.key))
+            logger.debug(f"Response cache hit for {intent}: '{best.query}' ({float(scores[index]):.3f})")
+            return best.response
+
+    def store(self, intent: str, query: str, embedding: np.ndarray, response: str):
+        if self._ttl(intent) <= 0:
+            return
+
+        now = time.time()
+        key = hashlib.sha1(f"{intent}:{query}".encode("utf-8")).hexdigest()
+        embedding = np.asarray(embedding, dtype=np.float32)
+        with self.lock:
+            self._add(CacheEntry(key, intent, query, embedding, response, now))
+            self._write(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, intent, query, embedding.tobytes(), response, now, now)
+            )
+            while len(self.entries) > self.max_entries:
+                oldest = next(iter(self.entries))
+                self._delete(oldest)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "mode": "disk" if self.db else "memory",
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "by_intent": {
+                intent: {"hits": self.hits[intent], "misses": self.misses[intent]}
+                for intent in sorted(set(self.hits) | set(self.misses))
+            },
+        }
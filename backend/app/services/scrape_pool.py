@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from app.config import settings
+from app.utils.logger import logger
+from app.utils.metrics import SCRAPE_TIMEOUTS
+
+
+class ScrapeQueueFull(Exception):
+    """Raised when more scrapes are waiting than the queue allows"""
+
+
+class ScrapePool:
+    """
+    Runs the blocking Selenium scrapers on a dedicated, size-limited thread pool
+    so a scrape never stalls the event loop.
+
+    At most max_workers scrapes run at once and at most max_queue wait behind
+    them; anything beyond that is rejected straight away. Each scrape has a
+    timeout measured from submission. A scrape whose caller is cancelled (for
+    example because the client disconnected) is dropped if it has not started
+    yet; one that is already running finishes in the background and its result
+    is discarded, since a WebDriver call cannot be interrupted from outside.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _count(self, name: str, outcome: str):
+        with self.lock:
+            self.counters[name][outcome] += 1
+
+    async def run(self, fn: Callable, *args, source: str, timeout: Optional[float] = None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the pool and returns its result. Counters
+        and metrics are labelled with source, the scraper's source id.
+        Raises ScrapeQueueFull when the queue is full and asyncio.TimeoutError
+        when the scrape does not finish in time.
+        """
+        with self.lock:
+            if self.queued >= self.max_queue:
+                self.counters[source]["rejected"] += 1
+                raise ScrapeQueueFull(f"{self.queued} scrapes already queued")
+            self.queued += 1
+
+        def job():
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+        future = self.executor.submit(job)
+
+        def on_done(done_future):
+            # A future cancelled before it started never ran job(), so it still counts as queued
+            if done_future.cancelled():
+                with self.lock:
+                    self.queued -= 1
+
+        future.add_done_callback(on_done)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self._count(source, "timeouts")
+            SCRAPE_TIMEOUTS.inc(source=source)
+            logger.warning(f"Scrape of {source} timed out after {timeout or self.timeout_seconds}s")
+            raise
+        except asyncio.CancelledError:
+            self._count(source, "cancelled")
+            logger.info(f"Scrape of {source} cancelled by its caller")
+            raise
+        except Exception:
+            self._count(source, "failed")
+            raise
+
+        self._count(source, "completed")
+        return result
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "by_source": {name: dict(counts) for name, counts in sorted(self.counters.items())},
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+scrape_pool = ScrapePool(
+    max_workers=settings.scrape_pool_workers,
+    max_queue=settings.scrape_queue_size,
+    timeout_seconds=settings.scrape_timeout_seconds
+)
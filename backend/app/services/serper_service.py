@@ -1,52 +1,88 @@
-import aiohttp
+import asyncio
 import json
 import os
-import cachetools
-import logging
+import time
+from typing import Dict, Optional
+from app.config import settings
+from app.storage.search_cache import SearchCache
+from app.utils.http_client import get_http_session
+from app.utils.logger import get_logger
 
-logger = logging.getLogger(__name__)
-cache = cachetools.TTLCache(maxsize=100, ttl=3600)
+logger = get_logger("serper")
+# Results younger than serper_fresh_seconds are served as they are; older ones,
+# up to serper_stale_seconds more, are served while a refresh runs behind them
+cache = SearchCache(
+    max_entries=settings.serper_cache_max_entries,
+    max_age_seconds=settings.serper_fresh_seconds + settings.serper_stale_seconds,
+    path=settings.serper_cache_path
+)
+# Upstream calls in flight, so concurrent searches for one query share a call
+inflight: Dict[str, asyncio.Task] = {}
+upstream_calls = 0
 
-async def search_serper(query: str) -> str:
-    cache_key = f"serper_{query}"
-    if cache_key in cache:
-        return cache[cache_key]
-    
-    top_result_to_return = 4
-    url = "https://google.serper.dev/search"
+TOP_RESULT_TO_RETURN = 4
+
+
+async def _fetch(query: str) -> str:
+    """Calls Serper and caches a successful result; errors are returned, not cached"""
+    global upstream_calls
+    upstream_calls += 1
     headers = {
         "X-API-KEY": os.environ.get('SERPER_API_KEY', 'YOUR_SERPER_API_KEY'),
         "Content-Type": "application/json"
     }
-    payload = json.dumps({"q": query, "num": top_result_to_return})
-    
+    payload = json.dumps({"q": query, "num": TOP_RESULT_TO_RETURN})
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, data=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logger.info(f"Serper API response: {json.dumps(data, indent=2)}")
-                    if 'organic' not in data:
-                        result = "Sorry, I couldn't find anything about that. There may be an issue with the Serper API key."
-                    else:
-                        results = data['organic']
-                        string = []
-                        for result in results[:top_result_to_return]:
-                            try:
-                                string.append('\n'.join([
-                                    f"Title: {result['title']}",
-                                    f"Link: {result['link']}",
-                                    f"Snippet: {result['snippet']}",
-                                    "\n-----------------"
-                                ]))
-                            except KeyError:
-                                continue
-                        result = '\n'.join(string) if string else "No recent updates found."
-                    cache[cache_key] = result
-                    return result
-                else:
-                    logger.error(f"API error: {response.status}")
-                    return f"API error: {response.status}"
+        session = await get_http_session()
+        async with session.post(settings.serper_url, headers=headers, data=payload) as response:
+            if response.status == 200:
+                data = await response.json()
+                if 'organic' not in data:
+                    # Usually a bad or exhausted API key: an error, so not cached
+                    logger.error(f"Serper response has no organic results: {list(data)}")
+                    return "Sorry, I couldn't find anything about that. There may be an issue with the Serper API key."
+                results = data['organic']
+                logger.debug(f"Serper returned {len(results)} results for {query!r}")
+                string = []
+                for result in results[:TOP_RESULT_TO_RETURN]:
+                    try:
+                        string.append('\n'.join([
+                            f"Title: {result['title']}",
+                            f"Link: {result['link']}",
+                            f"Snippet: {result['snippet']}",
+                            "\n-----------------"
+                        ]))
+                    except KeyError:
+                        continue
+                result = '\n'.join(string) if string else "No recent updates found."
+                await asyncio.to_thread(cache.set, f"serper_{query}", result)
+                return result
+            else:
+                logger.error(f"API error: {response.status}")
+                return f"API error: {response.status}"
     except Exception as e:
         logger.error(f"Error searching Serper: {str(e)}")
-        return "Unable to fetch updates at this time."
\ No newline at end of file
+        return "Unable to fetch updates at this time."
+
+
+def _refresh(query: str) -> asyncio.Task:
+    """The in-flight upstream call for query, starting one if there is none"""
+    task = inflight.get(query)
+    if task is None:
+        task = asyncio.create_task(_fetch(query))
+        inflight[query] = task
+        task.add_done_callback(lambda _: inflight.pop(query, None))
+    return task
+
+
+async def search_serper(query: str) -> str:
+    entry: Optional[tuple] = await asyncio.to_thread(cache.get, f"serper_{query}")
+    if entry is not None:
+        result, stored_at = entry
+        if time.time() - stored_at > settings.serper_fresh_seconds:
+            # Stale: answer now, refresh in the background
+            _refresh(query)
+        return result
+    # Shielded so a caller that gives up does not cancel the call others are waiting on
+    return await asyncio.shield(_refresh(query))
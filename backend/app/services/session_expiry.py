@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from app.utils.logger import logger
+
+# Sessions whose eviction failed are due again after this long
+EVICT_RETRY_SECONDS = 5.0
+
+
+class SessionExpiry:
+    """
+    Keeps a min-heap of (expiry time, session id) so a background task can
+    evict sessions as they fall due, without lookups ever scanning the store.
+
+    Touching a session pushes a new heap entry instead of moving the old one;
+    entries whose expiry no longer matches the session's latest deadline are
+    skipped when popped.
+
+    evict receives a batch of session ids and the last_accessed cutoff, and
+    returns how many sessions it actually removed.
+    """
+
+    def __init__(self, evict: Callable[[List[str], float], int], timeout_seconds: float,
+                 interval_seconds: float, batch_size: int):
+        self.evict = evict
+        self.timeout_seconds = timeout_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.heap: List[Tuple[float, str]] = []
+        self.deadlines: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.evicted = 0
+        self.sweeps = 0
+        self.last_sweep_ms: Optional[float] = None
+        self.max_sweep_ms = 0.0
+
+    def schedule(self, session_id: str, last_accessed: float):
+        deadline = last_accessed + self.timeout_seconds
+        with self.lock:
+            self.deadlines[session_id] = deadline
+            heapq.heappush(self.heap, (deadline, session_id))
+            # Sessions touched many times leave stale entries behind; drop them now and then
+            if len(self.heap) > 4 * len(self.deadlines) + 1024:
+                self.heap = [(deadline, sid) for sid, deadline in self.deadlines.items()]
+                heapq.heapify(self.heap)
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+                deadline, session_id = heapq.heappop(self.heap)
+                if self.deadlines.get(session_id) == deadline:
+                    del self.deadlines[session_id]
+                    due.append(session_id)
+        return due
+
+    def _requeue(self, session_ids: List[str], deadline: float):
+        """Puts popped sessions back, unless they were touched in the meantime"""
+        with self.lock:
+            for session_id in session_ids:
+                if session_id not in self.deadlines:
+                    self.deadlines[session_id] = deadline
+                    heapq.heappush(self.heap, (deadline, session_id))
+
+    def sweep(self) -> int:
+        """Evicts every session that is due, batch_size at a time. Blocking."""
+        start = time.perf_counter()
+        now = time.time()
+        evicted = 0
+        while True:
+            due = self._pop_due(now)
+            if not due:
+                break
+            try:
+                evicted += self.evict(due, now - self.timeout_seconds)
+            except Exception as e:
+                logger.error(f"Error evicting {len(due)} expired sessions, retrying in {EVICT_RETRY_SECONDS}s: {e}")
+                self._requeue(due, now + EVICT_RETRY_SECONDS)
+                break
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.sweeps += 1
+        self.evicted += evicted
+        self.last_sweep_ms = round(elapsed_ms, 3)
+        self.max_sweep_ms = max(self.max_sweep_ms, self.last_sweep_ms)
+        if evicted:
+            logger.info(f"Evicted {evicted} expired sessions in {elapsed_ms:.1f}ms")
+        return evicted
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await asyncio.to_thread(self.sweep)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def stats(self) -> Dict:
+        return {
+            "tracked_sessions": len(self.deadlines),
+            "heap_entries": len(self.heap),
+            "next_expiry_in_seconds": round(self.heap[0][0] - time.time(), 1) if self.heap else None,
+            "sweeps": self.sweeps,
+            "evicted": self.evicted,
+            "last_sweep_ms": self.last_sweep_ms,
+            "max_sweep_ms": self.max_sweep_ms,
+        }
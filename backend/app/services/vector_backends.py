@@ -0,0 +1,220 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+from langchain.docstore.document import Document
+from app.config import settings
+from app.services.embeddings import get_embeddings
+from app.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, single worker assumed
+    fcntl = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+EMBED_BATCH_SIZE = 256
+
+
+def _write_json(path: str, data: dict):
+    # Write to a temporary file first so readers never see a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _top_rows(queries: np.ndarray, matrix: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row indexes of the k best cosine matches in matrix for each query, best
+    first. Rows of matrix must already be L2-normalised.
+    """
+    queries = np.array(queries, dtype=np.float32)
+    queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    scores = queries @ matrix.T.astype(np.float32, copy=False)
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    # argpartition leaves the top k unordered; sort just those
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error(f"Error reading {path}, reindexing: {e}")
+        return {}
+
+
+class ChromaBackend:
+    """
+    Persisted Chroma collection. A manifest of content hashes next to it
+    records what is embedded, so only new or changed documents are embedded
+    on startup and vectors of removed documents are deleted.
+    With no directory the collection lives in memory.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        from langchain_community.vectorstores import Chroma
+
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json") if directory else None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.vector_store = Chroma(embedding_function=get_embeddings(), persist_directory=directory)
+
+    def sync(self, documents: Dict[str, Document]):
+        manifest = _read_json(self.manifest_path) if self.manifest_path else {}
+        # Without a manifest for the current model we cannot tell which stored
+        # vectors are still valid, so everything already stored is replaced once
+        rebuild = manifest.get("embedding_model") != settings.embedding_model_name
+        if rebuild:
+            indexed = set(self.vector_store.get(include=[])["ids"])
+            logger.info(f"No Chroma manifest for {settings.embedding_model_name}, reindexing all documents")
+        else:
+            indexed = set(manifest.get("documents", {}))
+
+        removed = [doc_id for doc_id in indexed if rebuild or doc_id not in documents]
+        added = [doc_id for doc_id in documents if rebuild or doc_id not in indexed]
+
+        if removed:
+            self.vector_store.delete(ids=removed)
+        for start in range(0, len(added), EMBED_BATCH_SIZE):
+            batch = added[start:start + EMBED_BATCH_SIZE]
+            self.vector_store.add_documents([documents[doc_id] for doc_id in batch], ids=batch)
+
+        if self.manifest_path:
+            _write_json(self.manifest_path, {
+                "embedding_model": settings.embedding_model_name,
+                "documents": {doc_id: document.metadata.get("source") for doc_id, document in documents.items()},
+            })
+        logger.info(
+            f"Chroma index synced: {len(added)} embedded, {len(removed)} deleted, "
+            f"{len(documents) - len(added)} unchanged"
+        )
+
+    def search(self, vectors: List[List[float]], k: int) -> List[List[str]]:
+        """Ids of the k nearest documents for each query vector, in one Chroma query"""
+        return self.vector_store._collection.query(query_embeddings=vectors, n_results=k, include=[])["ids"]
+
+    def search_subset(self, vector: List[float], k: int, ids: List[str]) -> List[str]:
+        """
+        Ids of the k nearest documents among ids only. Just those vectors are
+        fetched from Chroma and scored exactly, instead of querying the whole
+        collection and discarding what falls outside the subset.
+        """
+        stored = self.vector_store._collection.get(ids=ids, include=["embeddings"])
+        if not stored["ids"]:
+            return []
+        matrix = np.asarray(stored["embeddings"], dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return [stored["ids"][row] for row in _top_rows([vector], matrix, k)[0]]
+
+
+class NumpyBackend:
+    """
+    Exact search over L2-normalised embeddings stored as one .npy matrix,
+    with a sidecar JSON file listing the document id of each row.
+
+    The matrix is opened as a read-only memory map, so several uvicorn
+    workers share one copy through the page cache. A query batch is a single
+    matrix product followed by argpartition for the top k.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.matrix_path = os.path.join(directory, "embeddings.npy")
+        self.meta_path = os.path.join(directory, "embeddings.json")
+        self.lock_path = os.path.join(directory, "embeddings.lock")
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _lock(self):
+        """Stops two workers starting together from rewriting the matrix at once"""
+        with open(self.lock_path, "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _open(self, meta: dict):
+        self.ids = meta.get("ids", [])
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.matrix = np.load(self.matrix_path, mmap_mode="r") if self.ids else None
+
+    def sync(self, documents: Dict[str, Document]):
+        with self._lock():
+            meta = _read_json(self.meta_path)
+            valid = (
+                meta.get("embedding_model") == settings.embedding_model_name
+                and meta.get("dtype") == self.dtype.name
+                and os.path.exists(self.matrix_path)
+            )
+            indexed = meta.get("ids", []) if valid else []
+            if indexed == list(documents):
+                self._open(meta)
+                logger.info(f"NumPy index up to date: {len(indexed)} vectors")
+                return
+
+            old_rows = {doc_id: row for row, doc_id in enumerate(indexed)}
+            added = [doc_id for doc_id in documents if doc_id not in old_rows]
+            old_matrix = np.load(self.matrix_path, mmap_mode="r") if indexed else None
+
+            new_vectors = {}
+            for start in range(0, len(added), EMBED_BATCH_SIZE):
+                batch = added[start:start + EMBED_BATCH_SIZE]
+                vectors = np.asarray(
+                    get_embeddings().embed_documents([documents[doc_id].page_content for doc_id in batch]),
+                    dtype=np.float32
+                )
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                new_vectors.update(zip(batch, vectors))
+
+            ids = list(documents)
+            if ids:
+                dim = old_matrix.shape[1] if old_matrix is not None else len(next(iter(new_vectors.values())))
+                tmp_path = self.matrix_path + ".tmp.npy"
+                matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(len(ids), dim))
+                for row, doc_id in enumerate(ids):
+                    matrix[row] = old_matrix[old_rows[doc_id]] if doc_id in old_rows else new_vectors[doc_id]
+                matrix.flush()
+                del matrix, old_matrix
+                os.replace(tmp_path, self.matrix_path)
+
+            meta = {"embedding_model": settings.embedding_model_name, "dtype": self.dtype.name, "ids": ids}
+            _write_json(self.meta_path, meta)
+            self._open(meta)
+            logger.info(
+                f"NumPy index synced: {len(added)} embedded, {len(set(indexed) - set(ids))} deleted, "
+                f"{len(ids) - len(added)} unchanged"
+            )
+
+    def search(self, vectors: List[List[float]], k: int) -> List[List[str]]:
+        if self.matrix is None:
+            return [[] for _ in vectors]
+        return [[self.ids[row] for row in rows] for rows in _top_rows(vectors, self.matrix, k)]
+
+    def search_subset(self, vector: List[float], k: int, ids: List[str]) -> List[str]:
+        """Ids of the k nearest documents among ids; only their rows are read"""
+        rows = np.asarray(sorted(self.rows[doc_id] for doc_id in ids if doc_id in self.rows), dtype=np.int64)
+        if self.matrix is None or not len(rows):
+            return []
+        return [self.ids[rows[row]] for row in _top_rows([vector], self.matrix[rows], k)[0]]
+
+def create_vector_backend():
+    """The vector backend selected by settings.rag_vector_backend"""
+    if settings.rag_vector_backend == "numpy":
+        return NumpyBackend(os.path.join(BACKEND_DIR, "vector_index"), settings.rag_numpy_dtype)
+    return ChromaBackend(os.path.join(BACKEND_DIR, "chroma_db"))
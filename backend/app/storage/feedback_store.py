@@ -6,35 +6,177 @@ current_dir = Path(__file__).resolve().parent
 backend_dir = current_dir.parent.parent
 sys.path.append(str(backend_dir))
 
-from typing import Optional
-from datetime import datetime
+import argparse
+import asyncio
 import json
-from pathlib import Path
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.config import settings
+from app.utils.batching import MicroBatcher
 from app.utils.logger import logger
 
 class FeedbackStore:
-    def __init__(self):
-        self.feedback_file = Path("data/feedback.json")
-        self.feedback_file.parent.mkdir(exist_ok=True)
-        if not self.feedback_file.exists():
-            self.feedback_file.write_text("[]")
+    """
+    Feedback as an append-only JSON Lines log. Submissions go through one
+    background writer that appends each batch with a single write and fsyncs
+    it before the submitters are told their feedback is saved.
+
+    An in-memory index maps each session to the byte offsets of its records,
+    so reading a session's feedback only touches those lines. Records other
+    workers append are picked up from the end of the file on the next access.
+    """
+
+    def __init__(self, path: Optional[str] = None, legacy_path: Optional[str] = "data/feedback.json"):
+        # Relative paths are kept under the backend directory, not the working directory
+        self.path = backend_dir / (path or settings.feedback_log_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.offsets: Dict[str, List[int]] = defaultdict(list)
+        self.indexed_size = 0
+        self.inode: Optional[int] = None
+        if not self.path.exists() and legacy_path:
+            self._import_legacy(backend_dir / legacy_path)
+        self.writer = MicroBatcher(
+            self._append_batch,
+            window_seconds=settings.feedback_flush_interval_ms / 1000,
+            max_size=settings.feedback_batch_max_size
+        )
+        with self.lock:
+            self._catch_up()
 
-    async def save_feedback(self, session_id: str, feedback_text: str, 
+    def _import_legacy(self, legacy_path: Path):
+        """Converts the old whole-file JSON array into the log, once"""
+        if not legacy_path.exists():
+            return
+        try:
+            records = json.loads(legacy_path.read_text() or "[]")
+            self._write_log(records)
+            logger.info(f"Imported {len(records)} feedback records from {legacy_path}")
+        except Exception as e:
+            logger.error(f"Error importing feedback from {legacy_path}: {e}")
+
+    def _write_log(self, records: List[Dict]):
+        # Write to a temporary file first so the log is replaced in one step
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(self._encode(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _encode(record: Dict) -> bytes:
+        return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _catch_up(self):
+        """Indexes lines appended since the last call. Caller holds the lock."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        # A compacted log is a new file; index it from the start
+        if stat.st_ino != self.inode or stat.st_size < self.indexed_size:
+            self.offsets.clear()
+            self.indexed_size = 0
+            self.inode = stat.st_ino
+        if stat.st_size == self.indexed_size:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # another worker is still writing this line
+                try:
+                    self.offsets[json.loads(line)["session_id"]].append(offset)
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping malformed feedback record at byte {offset}")
+                offset += len(line)
+        self.indexed_size = offset
+
+    def _append_batch(self, records: List[Dict]) -> List[bool]:
+        data = b"".join(self._encode(record) for record in records)
+        with self.lock:
+            with open(self.path, "ab+") as f:
+                # A crash can leave a torn last line; start on a fresh one so it stays one bad record
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._catch_up()
+        return [True] * len(records)
+
+    async def save_feedback(self, session_id: str, feedback_text: str,
                           contact_info: Optional[str] = None):
+        feedback_data = {
+            "session_id": session_id,
+            "feedback": feedback_text,
+            "contact_info": contact_info,
+            "timestamp": datetime.now().isoformat()
+        }
         try:
-            feedback_data = {
-                "session_id": session_id,
-                "feedback": feedback_text,
-                "contact_info": contact_info,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Read existing feedback
-            current_data = json.loads(self.feedback_file.read_text())
-            current_data.append(feedback_data)
-            
-            # Write back to file
-            self.feedback_file.write_text(json.dumps(current_data, indent=2))
+            # Returns once the batch holding this record is on disk
+            await self.writer.submit(feedback_data)
         except Exception as e:
             logger.error(f"Error saving feedback: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _read_session(self, session_id: str) -> List[Dict]:
+        with self.lock:
+            self._catch_up()
+            offsets = list(self.offsets.get(session_id, []))
+            if not offsets:
+                return []
+            with open(self.path, "rb") as f:
+                records = []
+                for offset in offsets:
+                    f.seek(offset)
+                    records.append(json.loads(f.readline()))
+        return records
+
+    async def get_feedback(self, session_id: str) -> List[Dict]:
+        """Feedback records of one session, oldest first"""
+        return await asyncio.to_thread(self._read_session, session_id)
+
+    def compact(self, max_age_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Rewrites the log without malformed lines and, with max_age_days,
+        without records older than that. Blocking.
+        """
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days else None
+        with self.lock:
+            kept, dropped = [], 0
+            if self.path.exists():
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            record = None
+                        if not isinstance(record, dict) or "session_id" not in record:
+                            dropped += 1
+                            continue
+                        if cutoff and str(record.get("timestamp", "")) < cutoff:
+                            dropped += 1
+                            continue
+                        kept.append(record)
+            self._write_log(kept)
+            self._catch_up()
+        logger.info(f"Compacted feedback log: {len(kept)} kept, {dropped} dropped")
+        return {"kept": len(kept), "dropped": dropped}
+
+
+if __name__ == "__main__":
+    # Compaction replaces the log file; run it while the API is stopped
+    parser = argparse.ArgumentParser(description="Feedback log maintenance")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--max-age-days", type=int, default=None, help="drop records older than this")
+    args = parser.parse_args()
+    print(FeedbackStore().compact(args.max_age_days))
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.models.retrieval import RetrievalFilters
+from app.services.facets import FacetIndex, entry_facets
+from app.utils.logger import logger
+
+# Relative store paths are kept under the backend directory, not the working directory
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+class ListingStore:
+    """
+    Latest normalised listings per scraper source, kept in memory for the chat
+    handlers and written to a JSON file so they survive restarts. With no path
+    the store is memory only.
+
+    Each source also keeps a facet index over its listings, rebuilt whenever
+    the listings are replaced, so handlers can narrow them by location,
+    skill, company or date without scanning them.
+
+    replace() indexes and writes the whole store, so async callers run it in
+    a worker thread.
+    """
+
+    def __init__(self, path: Optional[str] = "data/listings.json"):
+        self.path = BACKEND_DIR / path if path else None
+        self.lock = threading.Lock()
+        self.sources: Dict[str, Dict] = {}
+        self.facet_indexes: Dict[str, FacetIndex] = {}
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.sources = self._load()
+        for source, entry in self.sources.items():
+            self.facet_indexes[source] = self._index(source, entry["items"])
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            logger.info(f"Loaded stored listings for {len(data)} sources")
+            return data
+        except Exception as e:
+            logger.error(f"Error loading listings: {e}")
+            return {}
+
+    @staticmethod
+    def _index(source: str, items: List[Dict]) -> FacetIndex:
+        index = FacetIndex()
+        for position, item in enumerate(items):
+            index.add(position, entry_facets(item, source))
+        return index
+
+    def _save(self):
+        # Write to a temporary file first so a crash never leaves a truncated store
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.sources, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def replace(self, source: str, items: List[Dict], url: str, stale: bool = False):
+        """
+        Swaps in a fresh set of listings for a source. Blocking. Stale listings,
+        such as a partial scrape, are stored as fetched long ago so the next
+        scheduled refresh replaces them straight away.
+        """
+        index = self._index(source, items)
+        with self.lock:
+            self.sources[source] = {"fetched_at": 0.0 if stale else time.time(), "url": url, "items": items}
+            self.facet_indexes[source] = index
+            if self.path:
+                try:
+                    self._save()
+                except Exception as e:
+                    logger.error(f"Error saving listings: {e}")
+
+    def get(self, source: str) -> Optional[List[Dict]]:
+        """Listings of a source, or None if it has never been ingested"""
+        entry = self.sources.get(source)
+        return entry["items"] if entry else None
+
+    def fetched_at(self, source: str) -> Optional[float]:
+        entry = self.sources.get(source)
+        return entry["fetched_at"] if entry else None
+
+    def facets(self, source: str) -> FacetIndex:
+        """Facet index of a source's current listings (empty if never ingested)"""
+        return self.facet_indexes.get(source) or FacetIndex()
+
+    def filter(self, source: str, filters: RetrievalFilters) -> Optional[List[Dict]]:
+        """
+        Listings of a source matching filters, in their original order, or
+        None when filters is empty or the source has never been ingested.
+        """
+        with self.lock:
+            entry = self.sources.get(source)
+            index = self.facet_indexes.get(source)
+            if not entry or not index:
+                return None
+            positions = index.match(filters)
+            if positions is None:
+                return None
+            return [entry["items"][position] for position in sorted(positions)]
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from app.utils.logger import logger
+
+class SearchCache:
+    """
+    Two-tier cache of search results: a small in-memory LRU in front of a
+    SQLite file that survives restarts and is shared by every worker. Entries
+    carry the time they were stored, so callers decide what counts as fresh
+    or stale. With no path only the memory tier is used.
+    """
+
+    def __init__(self, max_entries: int, max_age_seconds: float, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            db_path = Path(path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.db = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            with self.db:
+                self.db.execute("""
+                    CREATE TABLE IF NOT EXISTS search_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        stored_at REAL NOT NULL
+                    )
+                """)
+                # Entries past any use are removed once per start
+                self.db.execute("DELETE FROM search_cache WHERE stored_at < ?", (time.time() - max_age_seconds,))
+
+    def _remember(self, key: str, value: str, stored_at: float):
+        self.entries[key] = (value, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(value, stored_at) from memory, else from disk, or None. Blocking on a memory miss."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if time.time() - entry[1] <= self.max_age_seconds:
+                    self.entries.move_to_end(key)
+                    return entry
+                # Past any use; the disk row is at least as old, so it is skipped there too
+                del self.entries[key]
+            if self.db is None:
+                return None
+            try:
+                row = self.db.execute("SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Error reading search cache: {e}")
+                return None
+            if row is None or time.time() - row[1] > self.max_age_seconds:
+                return None
+            self._remember(key, row[0], row[1])
+            return row
+
+    def set(self, key: str, value: str):
+        stored_at = time.time()
+        with self.lock:
+            self._remember(key, value, stored_at)
+            if self.db is None:
+                return
+            try:
+                with self.db:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO search_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                        (key, value, stored_at)
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Error writing search cache: {e}")
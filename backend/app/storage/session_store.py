@@ -3,48 +3,116 @@ from pathlib import Path
 
 # Add the backend directory to sys.path
 current_dir = Path(__file__).resolve().parent
-backend_dir = current_dir.parent
+backend_dir = current_dir.parent.parent
 sys.path.append(str(backend_dir))
 
 import json
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import datetime
+from typing import List, Optional
 from app.models.session import SessionBase, SessionCreate, SessionUpdate
 from app.config import settings
+from app.services.session_expiry import SessionExpiry
 from app.utils.logger import logger
 
+# Statements are module constants so sqlite3's per-connection statement cache
+# prepares each one once and reuses it
+UPSERT_SESSION = """
+    INSERT INTO sessions (session_id, created_at, last_accessed, context) VALUES (?, ?, ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        created_at = excluded.created_at,
+        last_accessed = excluded.last_accessed,
+        context = excluded.context
+"""
+SELECT_SESSION = "SELECT created_at, last_accessed, context FROM sessions WHERE session_id = ? AND last_accessed >= ?"
+UPDATE_SESSION = "UPDATE sessions SET last_accessed = ?, context = ? WHERE session_id = ?"
+SELECT_CREATED_AT = "SELECT created_at FROM sessions WHERE session_id = ?"
+SELECT_LAST_ACCESSED = "SELECT session_id, last_accessed FROM sessions"
+
+# PRAGMA user_version once the legacy JSON file has been imported
+IMPORTED_VERSION = 1
+
+
 class SessionStore:
-    def __init__(self):
-        self.sessions_file = Path("data/sessions.json")
-        self.sessions_file.parent.mkdir(exist_ok=True)
-        if not self.sessions_file.exists():
-            self.sessions_file.write_text("{}")
-        self.sessions: Dict[str, SessionBase] = self._load_sessions()
-
-    def _load_sessions(self) -> Dict[str, SessionBase]:
-        try:
-            with open(self.sessions_file, "r") as f:
-                data = json.load(f)
-                return {
-                    sid: SessionBase(**session_data)
-                    for sid, session_data in data.items()
-                }
-        except Exception as e:
-            logger.error(f"Error loading sessions: {e}")
-            return {}
-
-    def _save_sessions(self):
-        try:
-            with open(self.sessions_file, "w") as f:
-                json.dump(
-                    {sid: session.dict() for sid, session in self.sessions.items()},
-                    f,
-                    indent=2,
-                    default=str
+    """
+    Sessions in SQLite, one row per session. Every change is a single row
+    upsert, so a write costs the same however many sessions exist, and WAL
+    mode lets several uvicorn workers read while one of them writes.
+    Sessions from the old data/sessions.json are imported once.
+
+    Expired sessions are hidden from reads straight away and deleted by the
+    expiry task in batches as they fall due.
+    """
+
+    def __init__(self, path: Optional[str] = None, import_path: Optional[str] = "data/sessions.json"):
+        # Relative paths are kept under the backend directory, not the working directory
+        db_path = backend_dir / (path or settings.session_store_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.expiry = SessionExpiry(
+            self._delete_expired,
+            timeout_seconds=settings.session_timeout_minutes * 60,
+            interval_seconds=settings.session_expiry_interval_seconds,
+            batch_size=settings.session_expiry_batch_size
+        )
+        # timeout makes a worker wait for another worker's write lock instead of failing
+        self.db = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    context TEXT NOT NULL
                 )
-        except Exception as e:
-            logger.error(f"Error saving sessions: {e}")
+            """)
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_accessed ON sessions (last_accessed)")
+        if import_path:
+            self._import_json(backend_dir / import_path)
+        # One pass at startup; from then on the expiry heap is kept up to date by writes
+        with self.lock:
+            for session_id, last_accessed in self.db.execute(SELECT_LAST_ACCESSED).fetchall():
+                self.expiry.schedule(session_id, last_accessed)
+
+    def _import_json(self, json_path: Path):
+        """Copies sessions from the legacy JSON file, once per database"""
+        with self.lock, self.db:
+            # BEGIN IMMEDIATE so two workers starting together do not both import
+            self.db.execute("BEGIN IMMEDIATE")
+            if self.db.execute("PRAGMA user_version").fetchone()[0] >= IMPORTED_VERSION:
+                return
+            imported = 0
+            if json_path.exists():
+                try:
+                    data = json.loads(json_path.read_text(encoding="utf-8") or "{}")
+                    for session_data in data.values():
+                        session = SessionBase(**session_data)
+                        self.db.execute(UPSERT_SESSION, self._row(session))
+                        imported += 1
+                except Exception as e:
+                    logger.error(f"Error importing sessions from {json_path}: {e}")
+            self.db.execute(f"PRAGMA user_version = {IMPORTED_VERSION}")
+        if imported:
+            logger.info(f"Imported {imported} sessions from {json_path}")
+
+    @staticmethod
+    def _row(session: SessionBase) -> tuple:
+        return (
+            session.session_id,
+            session.created_at.timestamp(),
+            session.last_accessed.timestamp(),
+            json.dumps(session.context, default=str),
+        )
+
+    @staticmethod
+    def _expiry_cutoff() -> float:
+        return time.time() - settings.session_timeout_minutes * 60
 
     def create_session(self, session: SessionCreate) -> SessionBase:
         new_session = SessionBase(
@@ -53,42 +121,59 @@ class SessionStore:
             last_accessed=datetime.now(),
             context=session.context
         )
-        self.sessions[session.session_id] = new_session
-        self._save_sessions()
+        try:
+            with self.lock, self.db:
+                self.db.execute(UPSERT_SESSION, self._row(new_session))
+        except sqlite3.Error as e:
+            logger.error(f"Error saving session {session.session_id}: {e}")
+            return new_session
+        self.expiry.schedule(new_session.session_id, new_session.last_accessed.timestamp())
         return new_session
 
     def get_session(self, session_id: str) -> Optional[SessionBase]:
-        self._cleanup_expired_sessions()
-        if session_id in self.sessions:
-            return self.sessions[session_id]
-        return None
+        # Only this session's row is read; an expired one is treated as gone
+        with self.lock:
+            row = self.db.execute(SELECT_SESSION, (session_id, self._expiry_cutoff())).fetchone()
+        if row is None:
+            return None
+        created_at, last_accessed, context = row
+        return SessionBase(
+            session_id=session_id,
+            created_at=datetime.fromtimestamp(created_at),
+            last_accessed=datetime.fromtimestamp(last_accessed),
+            context=json.loads(context)
+        )
 
     def update_session(self, session_id: str, update_data: SessionUpdate) -> Optional[SessionBase]:
-        if session_id not in self.sessions:
-            return None
-        
-        session = self.sessions[session_id]
-        updated_session = SessionBase(
+        with self.lock, self.db:
+            row = self.db.execute(SELECT_CREATED_AT, (session_id,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute(UPDATE_SESSION, (
+                update_data.last_accessed.timestamp(),
+                json.dumps(update_data.context, default=str),
+                session_id,
+            ))
+
+        self.expiry.schedule(session_id, update_data.last_accessed.timestamp())
+        return SessionBase(
             session_id=session_id,
-            created_at=session.created_at,
+            created_at=datetime.fromtimestamp(row[0]),
             last_accessed=update_data.last_accessed,
             context=update_data.context
         )
-        
-        self.sessions[session_id] = updated_session
-        self._save_sessions()
-        return updated_session
-
-    def _cleanup_expired_sessions(self):
-        expiry_time = datetime.now() - timedelta(minutes=settings.session_timeout_minutes)
-        expired_sessions = [
-            sid for sid, session in self.sessions.items()
-            if datetime.fromisoformat(session.last_accessed) < expiry_time
-        ]
-        
-        for sid in expired_sessions:
-            del self.sessions[sid]
-        
-        if expired_sessions:
-            self._save_sessions()
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
\ No newline at end of file
+
+    def _delete_expired(self, session_ids: List[str], cutoff: float) -> int:
+        """
+        Deletes the given sessions in one statement. The cutoff check keeps any
+        session another worker has touched since it was scheduled here.
+        """
+        placeholders = ",".join("?" * len(session_ids))
+        with self.lock, self.db:
+            return self.db.execute(
+                f"DELETE FROM sessions WHERE session_id IN ({placeholders}) AND last_accessed < ?",
+                (*session_ids, cutoff)
+            ).rowcount
+
+
+session_store = SessionStore()
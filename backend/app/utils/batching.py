@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """
+    Collects concurrent calls for up to window_seconds or max_size items and
+    hands them to process_batch in a single call on a worker thread, so the
+    event loop never runs the batch itself.
+
+    process_batch takes the list of items and returns one result per item, in
+    the same order. If it raises, every caller in that batch gets the error.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], window_seconds: float, max_size: int):
+        self.process_batch = process_batch
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        if self.worker is None or self.worker.done():
+            # Started on first use so it binds to the running event loop
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window_seconds
+        while len(batch) < self.max_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up while waiting are left out of the batch
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                results = await asyncio.to_thread(self.process_batch, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
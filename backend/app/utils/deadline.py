@@ -0,0 +1,41 @@
+import math
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    A point in time by which a request must be answered, passed from the
+    router down to the scrapers so every step can see how much time is left.
+    Built from a budget in seconds; None means no limit. Immutable, so one
+    instance can be shared with scraper threads.
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        self.expires_at = math.inf if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative; inf when there is no limit"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def timeout(self) -> Optional[float]:
+        """remaining() as a timeout for asyncio.wait_for, None when there is no limit"""
+        return None if self.expires_at == math.inf else self.remaining()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def has(self, seconds: float) -> bool:
+        """Whether a step expected to take this long still fits"""
+        return self.remaining() >= seconds
+
+    def cap(self, seconds: float) -> float:
+        """A timeout or pause of at most seconds that does not run past the deadline"""
+        return min(seconds, self.remaining())
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """An earlier deadline that leaves seconds over for the steps after it"""
+        deadline = Deadline(None)
+        deadline.expires_at = self.expires_at - seconds
+        return deadline
@@ -0,0 +1,32 @@
+from typing import Optional
+import aiohttp
+from app.config import settings
+
+# One pooled session for the whole app, so outbound calls reuse DNS lookups
+# and keep-alive connections instead of paying TCP and TLS setup every time
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """The shared client session, created on first use if startup has not made it yet"""
+    global _session
+    # Nothing is awaited between the check and the assignment, so callers on
+    # the event loop cannot create two sessions
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.http_pool_size,
+            ttl_dns_cache=300,
+            keepalive_timeout=settings.http_keepalive_seconds
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.http_timeout_seconds)
+        )
+    return _session
+
+
+async def close_http_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -1,36 +1,128 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Optional
+from app.config import settings
+
+# Attributes every LogRecord has; anything else was passed through extra= and is logged as a field
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields and the traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the DEBUG records of noisy loggers. Rates are keyed
+    by logger name and also apply to its children; INFO and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO:
+            return True
+        rate = self.rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Drops records when the queue is full instead of blocking or printing an error"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now, since args and frames may not
+        # outlive the call, but leave the formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logger(name: str) -> logging.Logger:
-    """Configure and return a logger instance"""
+    """
+    Configure and return a logger instance. Records are only put on a queue by
+    the calling thread; a listener thread formats them and writes the JSON log
+    file and the console, so a slow disk or terminal never blocks a request.
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
+    logger.setLevel(settings.log_level.upper())
+
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
-    
+
     # File handler with rotation
     file_handler = RotatingFileHandler(
         log_dir / "asha.log",
         maxBytes=1024 * 1024,  # 1MB
         backupCount=5
     )
-    file_handler.setFormatter(logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    ))
-    
+    file_handler.setFormatter(JsonFormatter())
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(logging.Formatter(
         "%(name)s - %(levelname)s - %(message)s"
     ))
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    queue_handler = DroppingQueueHandler(queue.Queue(settings.log_queue_size))
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+    listener = QueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(listener.stop)
+
+    logger.addHandler(queue_handler)
+
     return logger
 
-logger = setup_logger("asha-backend")
\ No newline at end of file
+
+def get_logger(name: str) -> logging.Logger:
+    """A child of the app logger, so its records go through the same queue"""
+    return logger.getChild(name)
+
+logger = setup_logger("asha-backend")
@@ -0,0 +1,210 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+from app.config import settings
+from app.utils.logger import logger
+
+# Seconds; covers a cached reply (milliseconds) up to a slow scrape (a minute)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket..., +Inf count], sum
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, (counts, total) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total[0]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    In-process metrics rendered in the Prometheus text format. Updates are a
+    dict lookup and an add under a per-metric lock, so instrumenting a hot
+    path costs microseconds.
+    """
+
+    def __init__(self):
+        self.metrics: List = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "asha_stage_duration_seconds",
+    "Time spent in each stage of the chat pipeline and of scraper runs",
+    ["stage", "intent", "source"]
+)
+REQUEST_SECONDS = registry.histogram(
+    "asha_chat_request_duration_seconds",
+    "End-to-end time of a chat request",
+    ["endpoint", "intent"]
+)
+CACHE_LOOKUPS = registry.counter(
+    "asha_response_cache_lookups_total",
+    "Semantic response cache lookups by result (hit or miss)",
+    ["intent", "result"]
+)
+MOCK_FALLBACKS = registry.counter(
+    "asha_mock_fallbacks_total",
+    "Replies built from mock data because no valid listings were available",
+    ["intent", "source"]
+)
+SCRAPER_WAIT_SECONDS = registry.histogram(
+    "asha_scraper_wait_seconds",
+    "Time scrapers spent waiting for a page condition, by outcome (met or timeout)",
+    ["source", "wait", "outcome"]
+)
+SCRAPER_BYTES = registry.counter(
+    "asha_scraper_bytes_total",
+    "Bytes scraper pages downloaded, from the DevTools network events read by their waits",
+    ["source"]
+)
+SCRAPER_BLOCKED_REQUESTS = registry.counter(
+    "asha_scraper_blocked_requests_total",
+    "Scraper page requests blocked by the fast-load profile",
+    ["source"]
+)
+SCRAPE_TIMEOUTS = registry.counter(
+    "asha_scrape_timeouts_total",
+    "Scrapes abandoned after the scrape pool timeout",
+    ["source"]
+)
+
+# OpenTelemetry tracer, set by setup_tracing when an OTLP endpoint is configured
+_tracer = None
+
+
+def setup_tracing():
+    """Exports stage spans to settings.otel_exporter_endpoint, if set and the SDK is installed"""
+    global _tracer
+    if not settings.otel_exporter_endpoint or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.warning(f"OpenTelemetry export disabled, SDK not available: {e}")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.otel_service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.otel_exporter_endpoint, insecure=True)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("asha-backend")
+    logger.info(f"Exporting traces to {settings.otel_exporter_endpoint}")
+
+
+@contextmanager
+def span(stage: str, intent: str = "", source: str = ""):
+    """Times a block as one pipeline stage, and traces it when export is on"""
+    start = time.perf_counter()
+    if _tracer is None:
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, intent=intent, source=source)
+        return
+    with _tracer.start_as_current_span(stage, attributes={"intent": intent, "source": source}):
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, intent=intent, source=source)
+
+
+class StageTimer:
+    """
+    Times consecutive steps of a linear routine such as a scraper run:
+    each mark() records the time since the previous mark as one stage.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.last = time.perf_counter()
+        self.last_ns = time.time_ns()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        now_ns = time.time_ns()
+        STAGE_SECONDS.observe(now - self.last, stage=stage, source=self.source)
+        if _tracer is not None:
+            # The step has already happened, so its span is recorded with explicit times
+            _tracer.start_span(stage, start_time=self.last_ns, attributes={"source": self.source}).end(end_time=now_ns)
+        self.last = now
+        self.last_ns = now_ns
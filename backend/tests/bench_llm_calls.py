@@ -0,0 +1,159 @@
+"""
+Benchmark: LLM calls per /api/chat request before and after merging the
+gender-bias check and intent classification into one analysis call, and
+with the embedding intent router and the semantic response cache in front of it.
+
+Runs offline against a fake LLM with a fixed per-call latency and stubbed
+scrapers, so no Gemini quota is spent and no browser is launched.
+
+Usage (from the backend directory):
+    python tests/bench_llm_calls.py
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.config import settings
+from app.models.chat import ChatRequest
+from app.services import chat_service as chat_module
+from app.services.chat_service import ChatService
+from app.services.ingestion import ingestion_scheduler
+from app.storage.listing_store import ListingStore
+
+LLM_LATENCY_SECONDS = 0.05
+
+QUERIES = [
+    ("Show me current job from `herkey.com`", "job_listing"),
+    ("What events are coming up?", "event"),
+    ("Are there any mentorship programs available?", "mentorship"),
+    ("How do I reset my password?", "faq"),
+    ("What is Asha Bot?", "unknown"),
+]
+
+
+class FakeLLM:
+    """Stands in for ChatGoogleGenerativeAI and counts ainvoke calls"""
+
+    def __init__(self, intents):
+        self.intents = intents
+        self.calls = 0
+
+    def _intent_for(self, prompt: str) -> str:
+        for query, intent in self.intents:
+            if query in prompt:
+                return intent
+        return "unknown"
+
+    async def ainvoke(self, prompt: str):
+        self.calls += 1
+        await asyncio.sleep(LLM_LATENCY_SECONDS)
+        if "is_biased" in prompt and "intent" in prompt:
+            content = json.dumps({
+                "is_biased": False,
+                "alternative_response": None,
+                "intent": self._intent_for(prompt)
+            })
+        elif "is_biased" in prompt:
+            content = json.dumps({"is_biased": False, "alternative_response": None})
+        elif "classify the intent" in prompt:
+            content = self._intent_for(prompt)
+        else:
+            content = "Here is what I found for you."
+        return SimpleNamespace(content=content)
+
+
+async def legacy_process_message(service: ChatService, chat_request: ChatRequest) -> str:
+    """The pre-merge pipeline: bias prompt, intent prompt, then the handler"""
+    await chat_module.llm.ainvoke(
+        f'Analyze this query for gender bias: "{chat_request.query}" '
+        '{"is_biased": false, "alternative_response": null}'
+    )
+    intent_result = await chat_module.llm.ainvoke(
+        f"Return ONLY ONE of these exact words to classify the intent: "
+        f"job_listing, event, mentorship, faq, unknown\nQuery: {chat_request.query}"
+    )
+    intent = intent_result.content.strip().lower()
+    prompt = await service._build_prompt(intent, chat_request.query)
+    return await service._generate(prompt)
+
+
+async def run_pipeline(name, process, intent_router_enabled=False, response_cache_mode="off", rounds=1):
+    settings.intent_router_enabled = intent_router_enabled
+    settings.response_cache_mode = response_cache_mode
+    fake_llm = FakeLLM(QUERIES)
+    chat_module.llm = fake_llm
+    service = ChatService()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i, (query, _) in enumerate(QUERIES):
+            # One session per query, so no request carries conversation context
+            # or triggers a summary call
+            await process(service, ChatRequest(session_id=f"bench-{i}", query=query))
+    elapsed = time.perf_counter() - start
+
+    requests = len(QUERIES) * rounds
+    return {
+        "pipeline": name,
+        "requests": requests,
+        "llm_calls": fake_llm.calls,
+        "llm_calls_per_request": fake_llm.calls / requests,
+        "avg_latency_ms": elapsed / requests * 1000,
+    }
+
+
+async def main():
+    # Scrapers return nothing so the handlers take their single fallback LLM call,
+    # and listings are kept in memory so the stored ones on disk are left alone
+    ingestion_scheduler.store = ListingStore(path=None)
+    for source in ingestion_scheduler.sources.values():
+        source.scraper = lambda search_query, deadline=None: []
+
+    before = await run_pipeline("bias + intent (before)", legacy_process_message)
+    after = await run_pipeline(
+        "combined analysis (after)",
+        lambda service, request: service.process_message(request)
+    )
+
+    rows = [before, after]
+
+    try:
+        import sentence_transformers  # noqa: F401
+        rows.append(await run_pipeline(
+            "embedding router (after)",
+            lambda service, request: service.process_message(request),
+            intent_router_enabled=True
+        ))
+        # Every query is asked twice, the second round is served from the cache
+        rows.append(await run_pipeline(
+            "router + cache, 2 rounds",
+            lambda service, request: service.process_message(request),
+            intent_router_enabled=True,
+            response_cache_mode="memory",
+            rounds=2
+        ))
+    except ImportError:
+        print("sentence-transformers not installed, skipping the embedding router and cache pipelines")
+
+    print(f"Fake LLM latency per call: {LLM_LATENCY_SECONDS * 1000:.0f} ms")
+    print(f"{'pipeline':<28}{'requests':>10}{'llm calls':>12}{'calls/req':>12}{'avg ms':>10}")
+    for row in rows:
+        print(
+            f"{row['pipeline']:<28}{row['requests']:>10}{row['llm_calls']:>12}"
+            f"{row['llm_calls_per_request']:>12.1f}{row['avg_latency_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
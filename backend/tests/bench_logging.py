@@ -0,0 +1,101 @@
+"""
+Benchmark: time spent in the calling thread per log call, for the old
+synchronous handlers (RotatingFileHandler and stdout written by the caller)
+and for the queued pipeline (the caller only enqueues; a listener thread
+formats and writes).
+
+Each call logs a payload about the size of a scraped job list. Console output
+goes to a pipe that is drained slowly, like a busy terminal or log shipper.
+
+Usage (from the backend directory):
+    python tests/bench_logging.py
+"""
+import json
+import logging
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+from app.utils.logger import DroppingQueueHandler, JsonFormatter
+
+CALLS = 2000
+PAYLOAD = json.dumps([
+    {"title": f"Software Engineer {i}", "company": "Example Corp", "location": "Bangalore",
+     "skills": "python, sql, aws", "apply_url": f"https://example.com/jobs/{i}"}
+    for i in range(20)
+])
+
+
+def slow_pipe():
+    """A pipe whose reader drains 4 KB every millisecond"""
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        with os.fdopen(read_fd, "rb") as reader:
+            while reader.read1(4096):
+                time.sleep(0.001)
+
+    threading.Thread(target=drain, daemon=True).start()
+    return os.fdopen(write_fd, "w")
+
+
+def handlers(log_dir: str):
+    file_handler = RotatingFileHandler(Path(log_dir) / "asha.log", maxBytes=1024 * 1024, backupCount=5)
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(slow_pipe())
+    console_handler.setFormatter(logging.Formatter("%(name)s - %(levelname)s - %(message)s"))
+    return file_handler, console_handler
+
+
+def measure(logger: logging.Logger) -> list:
+    timings = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        logger.info("Scraped jobs %d: %s", i, PAYLOAD)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def summary(name: str, timings: list):
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{name:<12}{statistics.median(timings):>10.1f}{p99:>10.1f}{max(timings):>10.1f}")
+
+
+def main():
+    print(f"{CALLS} calls, {len(PAYLOAD)} byte payload, microseconds per call in the caller")
+    print(f"{'pipeline':<12}{'p50':>10}{'p99':>10}{'max':>10}")
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        sync_logger = logging.getLogger("bench.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        for handler in handlers(log_dir):
+            sync_logger.addHandler(handler)
+        summary("synchronous", measure(sync_logger))
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        queued_logger = logging.getLogger("bench.queued")
+        queued_logger.propagate = False
+        queued_logger.setLevel(logging.INFO)
+        queue_handler = DroppingQueueHandler(queue.Queue(CALLS * 2))
+        listener = QueueListener(queue_handler.queue, *handlers(log_dir), respect_handler_level=True)
+        listener.start()
+        queued_logger.addHandler(queue_handler)
+        summary("queued", measure(queued_logger))
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
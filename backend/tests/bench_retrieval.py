@@ -0,0 +1,113 @@
+"""
+Benchmark: recall@k and per-query latency of dense-only versus hybrid
+(BM25 + dense, reciprocal-rank fused) retrieval over the job listings in
+data/herkey_jobs.json and data/naukri_jobs.json.
+
+Each labelled query names the document field and value that make a listing
+relevant. Recall@k is the share of relevant listings in the top k, capped at
+k so queries with many relevant listings can still reach 1.0. Both vector
+backends are measured: an in-memory Chroma collection and the NumPy backend
+in a temporary directory, so the persisted indexes are not touched.
+
+Usage (from the backend directory):
+    python tests/bench_retrieval.py
+"""
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+from app.services.rag_service import HybridRetriever, document_id, entry_to_document
+from app.services.vector_backends import ChromaBackend, NumpyBackend
+
+DATA_FILES = ["herkey_jobs.json", "naukri_jobs.json"]
+K_VALUES = [1, 5, 10]
+
+# (query, fields to look in, value that makes a listing relevant)
+LABELLED_QUERIES = [
+    ("Python", ["title", "skills"], "python"),
+    ("Python developer jobs", ["title"], "python"),
+    ("Bangalore", ["details"], "bangalore"),
+    ("Hyderabad", ["details"], "hyderabad"),
+    ("jobs at Micron", ["company"], "micron"),
+    ("GoDaddy", ["company"], "godaddy"),
+    ("work from home jobs", ["details"], "work from home"),
+    ("DevOps engineer", ["title"], "devops"),
+    ("Java developer", ["title"], "java"),
+    ("Financial Analyst", ["title"], "financial analyst"),
+    ("firmware engineer roles", ["title", "skills"], "firmware"),
+    ("human resources", ["title", "skills"], "human resources"),
+    ("content writer", ["title"], "writer"),
+]
+
+
+def load_documents():
+    documents = {}
+    for filename in DATA_FILES:
+        with open(backend_dir / "data" / filename, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                document = entry_to_document(entry, filename)
+                if document:
+                    documents.setdefault(document_id(document), document)
+    return documents
+
+
+def is_relevant(document, fields, value):
+    for line in document.page_content.split("\n"):
+        name, _, text = line.partition(": ")
+        if name.lower().replace(" ", "_") in fields and value in text.lower():
+            return True
+    return False
+
+
+def evaluate(retriever, documents, backend, mode):
+    recalls = {k: [] for k in K_VALUES}
+    latencies = []
+    for query, fields, value in LABELLED_QUERIES:
+        relevant = {doc_id for doc_id, document in documents.items() if is_relevant(document, fields, value)}
+        start = time.perf_counter()
+        ranked = retriever.search_batch([query], max(K_VALUES), mode)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        ranked_ids = [document_id(document) for document in ranked]
+        for k in K_VALUES:
+            hits = len(relevant & set(ranked_ids[:k]))
+            recalls[k].append(hits / min(len(relevant), k) if relevant else 0.0)
+    return {
+        "backend": backend,
+        "mode": mode,
+        **{f"recall@{k}": statistics.mean(values) for k, values in recalls.items()},
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+def main():
+    documents = load_documents()
+    rows = []
+    with tempfile.TemporaryDirectory() as numpy_dir:
+        for name, backend in [("chroma", ChromaBackend()), ("numpy", NumpyBackend(numpy_dir))]:
+            backend.sync(documents)
+            retriever = HybridRetriever(backend, documents)
+            # Warm the model so the first measured query does not pay for loading it
+            retriever.search_batch(["warm-up"], 1, "dense")
+            rows.extend(evaluate(retriever, documents, name, mode) for mode in ("dense", "hybrid"))
+
+    print(f"{len(documents)} unique listings, {len(LABELLED_QUERIES)} labelled queries")
+    header = f"{'backend':<9}{'mode':<8}" + "".join(f"{f'recall@{k}':>11}" for k in K_VALUES) + f"{'p50 ms':>9}{'max ms':>9}"
+    print(header)
+    for row in rows:
+        print(
+            f"{row['backend']:<9}{row['mode']:<8}" + "".join(f"{row[f'recall@{k}']:>11.2f}" for k in K_VALUES)
+            + f"{row['p50_ms']:>9.1f}{row['max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
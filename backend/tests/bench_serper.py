@@ -0,0 +1,172 @@
+"""
+Benchmark: search_serper against a local stub of the Serper API, before and
+after moving to the shared pooled HTTP client and the two-tier cache.
+
+The stub counts requests and TCP connections and answers after a fixed
+delay. Measured:
+  - connections opened for sequential uncached searches, with a new
+    ClientSession per call (the old code) and with the shared session
+  - upstream calls for 50 concurrent searches of one query (coalescing)
+  - latency of a stale hit and the background refresh it triggers
+  - a restart: a fresh process-level cache reading the SQLite tier
+
+Usage (from the backend directory):
+    python tests/bench_serper.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+import aiohttp
+from aiohttp import web
+
+STUB_LATENCY_SECONDS = 0.02
+SEQUENTIAL_QUERIES = 20
+CONCURRENT_CALLERS = 50
+
+# The cache file is opened when serper_service is imported, so point it at a
+# temporary directory first; the real cache under data/ is left alone
+tmp_dir = tempfile.mkdtemp()
+os.environ["SERPER_CACHE_PATH"] = os.path.join(tmp_dir, "serper_cache.sqlite3")
+
+from app.config import settings
+from app.services import serper_service
+from app.storage.search_cache import SearchCache
+from app.utils.http_client import close_http_session
+
+
+class StubSerper:
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        # Off to answer like Serper does for a bad API key
+        self.organic = True
+
+    async def search(self, request):
+        self.requests += 1
+        body = await request.json()
+        await asyncio.sleep(STUB_LATENCY_SECONDS)
+        if not self.organic:
+            return web.json_response({"message": "Unauthorized."})
+        return web.json_response({"organic": [
+            {"title": f"{body['q']} result {i}", "link": f"https://example.com/{i}", "snippet": "..."}
+            for i in range(body.get("num", 4))
+        ]})
+
+    async def start(self) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_post("/search", self.search)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        stub = self
+
+        # Count accepted TCP connections through the server's connection hook
+        original = runner.server.connection_made
+
+        def connection_made(handler, transport):
+            stub.connections += 1
+            return original(handler, transport)
+
+        runner.server.connection_made = connection_made
+        port = site._server.sockets[0].getsockname()[1]
+        settings.serper_url = f"http://127.0.0.1:{port}/search"
+        return runner
+
+    def reset(self):
+        self.requests = 0
+        self.connections = 0
+
+
+async def search_with_new_session(query: str) -> str:
+    """The old call path: a ClientSession per search"""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(settings.serper_url, data=json.dumps({"q": query, "num": 4})) as response:
+            return json.dumps(await response.json())
+
+
+def fresh_cache(path=None) -> SearchCache:
+    return SearchCache(
+        max_entries=settings.serper_cache_max_entries,
+        max_age_seconds=settings.serper_fresh_seconds + settings.serper_stale_seconds,
+        path=path
+    )
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def main():
+    stub = StubSerper()
+    runner = await stub.start()
+    rows = []
+
+    # Sequential uncached searches, old path
+    stub.reset()
+    start = time.perf_counter()
+    for i in range(SEQUENTIAL_QUERIES):
+        await search_with_new_session(f"old query {i}")
+    rows.append(("new session per call", SEQUENTIAL_QUERIES, stub.requests, stub.connections,
+                 (time.perf_counter() - start) * 1000 / SEQUENTIAL_QUERIES))
+
+    # Sequential uncached searches, shared session (memory-only cache so every query misses)
+    serper_service.cache = fresh_cache()
+    stub.reset()
+    start = time.perf_counter()
+    for i in range(SEQUENTIAL_QUERIES):
+        await serper_service.search_serper(f"new query {i}")
+    rows.append(("shared pooled session", SEQUENTIAL_QUERIES, stub.requests, stub.connections,
+                 (time.perf_counter() - start) * 1000 / SEQUENTIAL_QUERIES))
+
+    # Concurrent searches of one uncached query
+    serper_service.cache = fresh_cache(os.environ["SERPER_CACHE_PATH"])
+    stub.reset()
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        serper_service.search_serper("women in tech events") for _ in range(CONCURRENT_CALLERS)
+    ])
+    assert len(set(results)) == 1
+    rows.append(("coalesced, one query", CONCURRENT_CALLERS, stub.requests, stub.connections,
+                 (time.perf_counter() - start) * 1000 / CONCURRENT_CALLERS))
+
+    # Stale hit: answered from cache at once, refreshed behind the caller
+    fresh_seconds = settings.serper_fresh_seconds
+    settings.serper_fresh_seconds = 0
+    stub.reset()
+    _, stale_ms = await timed(serper_service.search_serper("women in tech events"))
+    await asyncio.gather(*serper_service.inflight.values())
+    stale_refreshes = stub.requests
+    settings.serper_fresh_seconds = fresh_seconds
+
+    # Restart: an empty memory tier over the same SQLite file
+    serper_service.cache = fresh_cache(os.environ["SERPER_CACHE_PATH"])
+    stub.reset()
+    _, restart_ms = await timed(serper_service.search_serper("women in tech events"))
+    restart_upstream = stub.requests
+
+    await close_http_session()
+    await runner.cleanup()
+
+    print(f"stub latency {STUB_LATENCY_SECONDS * 1000:.0f} ms")
+    print(f"{'path':<24}{'searches':>9}{'upstream':>10}{'conns':>7}{'avg ms':>9}")
+    for name, searches, upstream, connections, avg_ms in rows:
+        print(f"{name:<24}{searches:>9}{upstream:>10}{connections:>7}{avg_ms:>9.1f}")
+    print(f"stale hit: {stale_ms:.1f} ms, background refreshes: {stale_refreshes}")
+    print(f"after restart: {restart_ms:.1f} ms from SQLite, upstream calls: {restart_upstream}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,314 @@
+"""
+Load test: throughput, tail latency and event-loop lag of POST /api/chat
+under N concurrent simulated sessions.
+
+The FastAPI app is driven in-process through httpx's ASGI transport, with
+Gemini replaced by a deterministic fake LLM and the four scrapers by fake
+ones that sleep on the scrape pool like a browser would. Latencies of both
+are drawn from configurable distributions with a fixed seed, so runs are
+comparable. Background warm-up (embeddings, Chroma, Chrome) is not started.
+
+Event-loop lag is measured by a ticker that should wake every 10 ms; the
+overshoot is how long something blocked the loop. A scraper or an LLM call
+that slips back onto the loop shows up here long before it shows up in p99.
+
+Results can be saved as a baseline and later runs compared against it; the
+exit code is 1 when a run regresses beyond the tolerance. Baselines are
+machine specific and not committed: --compare without one only says so.
+
+Usage (from the backend directory):
+    python tests/load_chat.py --sessions 50 --turns 5
+    python tests/load_chat.py --save-baseline
+    python tests/load_chat.py --compare
+
+Latency distributions are "fixed:MS", "uniform:LOW_MS:HIGH_MS" or
+"lognormal:P50_MS:P99_MS".
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault("GOOGLE_API_KEY", "load-test")
+
+import httpx
+
+from app.config import settings
+
+DEFAULT_BASELINE = current_dir / "load_chat_baseline.json"
+LAG_TICK_SECONDS = 0.01
+
+# Each simulated session walks through a few of these, in order
+CONVERSATIONS = [
+    ["Show me current job from `herkey.com`", "Any Python roles in Bangalore?", "What about remote ones?"],
+    ["What events are coming up?", "Anything this weekend?", "How do I register?"],
+    ["Are there any mentorship programs available?", "I want a mentor for product management"],
+    ["How do I reset my password?", "Thanks, and how do I update my resume?"],
+    ["Show me current job from `naukri.com`", "Any data engineer jobs?"],
+]
+
+INTENT_KEYWORDS = [
+    ("mentor", "mentorship"),
+    ("event", "event"),
+    ("weekend", "event"),
+    ("register", "event"),
+    ("job", "job_listing"),
+    ("role", "job_listing"),
+    ("password", "faq"),
+    ("resume", "faq"),
+]
+
+
+class LatencyDistribution:
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        values = [float(p) / 1000 for p in params]
+        if kind == "fixed" and len(values) == 1:
+            self._sample = lambda rng: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._sample = lambda rng: rng.uniform(values[0], values[1])
+        elif kind == "lognormal" and len(values) == 2:
+            # Median p50, and sigma chosen so the 99th percentile lands on p99
+            mu = math.log(values[0])
+            sigma = math.log(values[1] / values[0]) / 2.326
+            self._sample = lambda rng: rng.lognormvariate(mu, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+        self.rng = random.Random(0)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        # Scrapers sample from pool threads
+        with self.lock:
+            return self._sample(self.rng)
+
+
+class FakeLLM:
+    """Stands in for ChatGoogleGenerativeAI: ainvoke and astream with sampled latency"""
+
+    def __init__(self, latency: LatencyDistribution, stream_chunks: int = 8):
+        self.latency = latency
+        self.stream_chunks = stream_chunks
+        self.calls = 0
+
+    @staticmethod
+    def _intent_for(prompt: str) -> str:
+        query = prompt.rsplit("Query:", 1)[-1].lower()
+        for keyword, intent in INTENT_KEYWORDS:
+            if keyword in query:
+                return intent
+        return "unknown"
+
+    def _content(self, prompt: str) -> str:
+        if "is_biased" in prompt and "intent" in prompt:
+            return json.dumps({"is_biased": False, "alternative_response": None, "intent": self._intent_for(prompt)})
+        if "is_biased" in prompt:
+            return json.dumps({"is_biased": False, "alternative_response": None})
+        if "Update the summary" in prompt:
+            return "The user is looking for jobs, events and mentorship."
+        return "Here is what I found for you: a few listings that match what you asked for."
+
+    async def ainvoke(self, prompt: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample())
+        return SimpleNamespace(content=self._content(prompt))
+
+    async def astream(self, prompt: str):
+        self.calls += 1
+        content = self._content(prompt)
+        delay = self.latency.sample() / self.stream_chunks
+        size = max(1, len(content) // self.stream_chunks)
+        for start in range(0, len(content), size):
+            await asyncio.sleep(delay)
+            yield SimpleNamespace(content=content[start:start + size])
+
+
+def fake_scraper(name: str, latency: LatencyDistribution, calls: dict):
+    """A scraper that blocks its pool thread for a sampled time, like Selenium does"""
+    def scrape(search_query, deadline=None):
+        calls[name] = calls.get(name, 0) + 1
+        time.sleep(latency.sample())
+        if name.endswith("jobs"):
+            return [
+                {"title": f"Python Developer {i}", "company": f"Company {i}",
+                 "details": f"{['Bangalore', 'Pune', 'Mumbai'][i % 3]} | Work From Home | 2-5 Yr",
+                 "skills": "Python • SQL", "salary": "Not disclosed", "apply_url": f"https://example.com/job/{i}"}
+                for i in range(20)
+            ]
+        if name.endswith("events"):
+            return [
+                {"title": f"Women in Tech Meetup {i}", "date": "18 Oct 2026", "location": "Online",
+                 "description": "Networking and talks", "url": f"https://example.com/event/{i}"}
+                for i in range(10)
+            ]
+        return [
+            {"title": f"Product Mentorship {i}", "mentor_name": f"Mentor {i}",
+             "description": "Monthly sessions", "url": f"https://example.com/mentor/{i}"}
+            for i in range(10)
+        ]
+    return scrape
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def monitor_loop_lag(samples: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_TICK_SECONDS)
+        samples.append(max(0.0, loop.time() - start - LAG_TICK_SECONDS) * 1000)
+
+
+async def run_session(client, session_id, turns, think_seconds, latencies, errors, rng):
+    conversation = CONVERSATIONS[rng.randrange(len(CONVERSATIONS))]
+    for turn in range(turns):
+        query = conversation[turn % len(conversation)]
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/chat", json={"session_id": session_id, "query": query})
+            if response.status_code != 200:
+                errors.append(response.status_code)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        await asyncio.sleep(rng.uniform(0, think_seconds))
+
+
+async def run(args) -> dict:
+    # Listings stay in memory and go stale quickly, so the fake scrapers keep
+    # running on the scrape pool during the test instead of once at the start
+    settings.ingestion_enabled = False
+    settings.intent_router_enabled = args.router
+    settings.response_cache_mode = "memory" if args.cache else "off"
+    settings.ingestion_intervals_seconds = {name: args.scrape_interval for name in settings.ingestion_intervals_seconds}
+
+    from app.main import app
+    from app.routers import chat as chat_router
+    from app.services import chat_service as chat_module
+    from app.services.ingestion import ingestion_scheduler
+    from app.storage.listing_store import ListingStore
+
+    llm_latency = LatencyDistribution(args.llm_latency)
+    scrape_latency = LatencyDistribution(args.scrape_latency)
+    fake_llm = FakeLLM(llm_latency)
+    chat_module.llm = fake_llm
+    scrape_calls = {}
+    ingestion_scheduler.store = ListingStore(path=None)
+    for name, source in ingestion_scheduler.sources.items():
+        source.scraper = fake_scraper(name, scrape_latency, scrape_calls)
+    chat_router.get_chat_service()
+
+    rng = random.Random(args.seed)
+    latencies, errors, lag_samples = [], [], []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag_samples, stop))
+
+    limits = httpx.Limits(max_connections=args.sessions)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            run_session(client, f"load-{i}", args.turns, args.think_ms / 1000, latencies, errors,
+                        random.Random(rng.random()))
+            for i in range(args.sessions)
+        ])
+        elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+
+    return {
+        "sessions": args.sessions,
+        "turns": args.turns,
+        "llm_latency": args.llm_latency,
+        "scrape_latency": args.scrape_latency,
+        "requests": len(latencies) + len(errors),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "loop_lag_p99_ms": round(percentile(lag_samples, 99), 1),
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0), 1),
+        "llm_calls": fake_llm.calls,
+        "scrape_calls": sum(scrape_calls.values()),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float, lag_margin_ms: float) -> list:
+    """Descriptions of every metric that regressed against the baseline"""
+    regressions = []
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key} {baseline[key]} -> {result[key]}")
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput_rps {baseline['throughput_rps']} -> {result['throughput_rps']}")
+    if result["loop_lag_p99_ms"] > baseline["loop_lag_p99_ms"] + lag_margin_ms:
+        regressions.append(f"loop_lag_p99_ms {baseline['loop_lag_p99_ms']} -> {result['loop_lag_p99_ms']}")
+    if result["errors"] > baseline["errors"]:
+        regressions.append(f"errors {baseline['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /api/chat with a fake LLM and fake scrapers")
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=5, help="requests per session")
+    parser.add_argument("--think-ms", type=float, default=200, help="max pause between a session's requests")
+    parser.add_argument("--llm-latency", default="lognormal:300:1200")
+    parser.add_argument("--scrape-latency", default="lognormal:2000:6000")
+    parser.add_argument("--scrape-interval", type=int, default=5, help="seconds before listings go stale")
+    parser.add_argument("--router", action="store_true", help="enable the embedding intent router")
+    parser.add_argument("--cache", action="store_true", help="enable the semantic response cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if this run regresses against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--lag-margin-ms", type=float, default=20, help="allowed extra loop lag")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif args.compare:
+        if not args.baseline.exists():
+            # Baselines depend on the machine, so none is committed; a fresh checkout has nothing to compare
+            print(f"No baseline at {args.baseline} to compare against; record one with --save-baseline")
+            return
+        baseline = json.loads(args.baseline.read_text())
+        differing = [key for key in ("sessions", "turns", "llm_latency", "scrape_latency") if baseline.get(key) != result[key]]
+        if differing:
+            print(f"Warning: baseline was run with different {', '.join(differing)}")
+        regressions = compare(result, baseline, args.tolerance, args.lag_margin_ms)
+        if regressions:
+            print("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Serper client checks against the local stub from bench_serper: connection
+reuse, coalescing of concurrent searches, the SQLite tier across a restart,
+and that error results are not cached.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the backend directory to sys.path
+current_dir = Path(__file__).resolve().parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(current_dir))
+
+# Imported first: it points the Serper cache at a temporary file
+from bench_serper import CONCURRENT_CALLERS, SEQUENTIAL_QUERIES, StubSerper, fresh_cache
+from app.services import serper_service
+from app.utils.http_client import close_http_session
+
+
+def run_with_stub(check):
+    """Runs check(stub) on a fresh event loop against a running stub server"""
+    async def main():
+        stub = StubSerper()
+        runner = await stub.start()
+        try:
+            await check(stub)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+    asyncio.run(main())
+
+
+def test_sequential_searches_share_connections():
+    async def check(stub):
+        serper_service.cache = fresh_cache()
+        for i in range(SEQUENTIAL_QUERIES):
+            await serper_service.search_serper(f"query {i}")
+        assert stub.requests == SEQUENTIAL_QUERIES
+        assert stub.connections == 1
+    run_with_stub(check)
+
+
+def test_concurrent_searches_make_one_upstream_call():
+    async def check(stub):
+        serper_service.cache = fresh_cache()
+        results = await asyncio.gather(*[
+            serper_service.search_serper("women in tech events") for _ in range(CONCURRENT_CALLERS)
+        ])
+        assert stub.requests == 1
+        assert len(set(results)) == 1
+    run_with_stub(check)
+
+
+def test_restart_is_served_from_sqlite():
+    async def check(stub):
+        path = os.environ["SERPER_CACHE_PATH"]
+        serper_service.cache = fresh_cache(path)
+        first = await serper_service.search_serper("women leadership stories")
+        # A new process: empty memory tier over the same file
+        serper_service.cache = fresh_cache(path)
+        stub.reset()
+        assert await serper_service.search_serper("women leadership stories") == first
+        assert stub.requests == 0
+    run_with_stub(check)
+
+
+def test_missing_organic_results_are_not_cached():
+    async def check(stub):
+        serper_service.cache = fresh_cache()
+        stub.organic = False
+        result = await serper_service.search_serper("weekly sessions")
+        assert "Serper API key" in result
+        stub.organic = True
+        assert "Title:" in await serper_service.search_serper("weekly sessions")
+        assert stub.requests == 2
+    run_with_stub(check)
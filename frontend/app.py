@@ -3,8 +3,6 @@ import requests
 import uuid
 from datetime import datetime
 from pathlib import Path
-import asyncio
-import aiohttp
 import json
 import os
 import bcrypt
@@ -135,44 +133,37 @@ def chatbot_page():
     # API endpoints (configurable)
     BASE_API_URL = "http://localhost:8000/api"
     CHAT_ENDPOINT = f"{BASE_API_URL}/chat"
+    CHAT_STREAM_ENDPOINT = f"{BASE_API_URL}/chat/stream"
     FEEDBACK_ENDPOINT = f"{BASE_API_URL}/feedback"
     NAUKRI_JOBS_ENDPOINT = f"{BASE_API_URL}/jobs/naukri"
+    SEARCH_ENDPOINT = f"{BASE_API_URL}/search"
 
-    # Serper search function
-    async def search_serper(query: str) -> str:
-        top_result_to_return = 4
-        url = "https://google.serper.dev/search"
-        logger.info(f"Serper query: {query}")
-        headers = {
-            "X-API-KEY": os.environ.get('SERPER_API_KEY', 'YOUR_SERPER_API_KEY'),,
-            "Content-Type": "application/json"
-        }
-        payload = json.dumps({"q": query, "num": top_result_to_return})
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, data=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if 'organic' not in data:
-                        result = "Sorry, I couldn't find anything about that. There may be an issue with the Serper API key."
-                    else:
-                        results = data['organic']
-                        string = []
-                        for result in results[:top_result_to_return]:
-                            try:
-                                string.append('\n'.join([
-                                    f"Title: {result['title']}",
-                                    f"Link: {result['link']}",
-                                    f"Snippet: {result['snippet']}",
-                                    "\n-----------------"
-                                ]))
-                            except KeyError:
-                                continue
-                        result = '\n'.join(string) if string else "No recent updates found."
-                    return result
-                else:
-                    logger.error(f"Serper API error: {response.status}")
-                    return f"API error: {response.status}"
+    # Streaming chat function
+    def stream_chat_reply(payload: dict) -> str:
+        """Reads the SSE chat stream and renders the reply as tokens arrive"""
+        placeholder = st.empty()
+        placeholder.markdown("<div class='chat-bubble-bot'><span>Asha is thinking...</span></div>", unsafe_allow_html=True)
+        reply = ""
+        event = None
+        with requests.post(CHAT_STREAM_ENDPOINT, json=payload, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    reply += data.get("text", "")
+                    placeholder.markdown(f"<div class='chat-bubble-bot'><span>{reply}</span></div>", unsafe_allow_html=True)
+                elif event == "done":
+                    reply = data.get("response", reply)
+                elif event == "error":
+                    raise requests.RequestException(data.get("detail", "Streaming error"))
+        return reply or "Sorry, I couldn't understand that."
 
     # ---- Sidebar ---- #
     with st.sidebar:
@@ -242,23 +233,18 @@ def chatbot_page():
 
         if submit and user_input:
             st.session_state.chat_history.append(("You", user_input))
-            with st.spinner("Asha is thinking..."):
-                try:
-                    response = requests.post(
-                        CHAT_ENDPOINT,
-                        json={
-                            "session_id": st.session_state.session_id,
-                            "query": user_input,
-                            "contact_info": contact_info or None
-                        }
-                    )
-                    response.raise_for_status()
-                    bot_reply = response.json().get("response", "Sorry, I couldn't understand that.")
-                    st.session_state.chat_history.append(("Asha", bot_reply))
-                    st.rerun()
-                except requests.RequestException as e:
-                    st.session_state.chat_history.append(("Asha", f"🚫 Error: {str(e)}"))
-                    st.rerun()
+            st.markdown(f"<div class='chat-bubble-user'><span>{user_input}</span></div>", unsafe_allow_html=True)
+            try:
+                bot_reply = stream_chat_reply({
+                    "session_id": st.session_state.session_id,
+                    "query": user_input,
+                    "contact_info": contact_info or None
+                })
+                st.session_state.chat_history.append(("Asha", bot_reply))
+                st.rerun()
+            except requests.RequestException as e:
+                st.session_state.chat_history.append(("Asha", f"🚫 Error: {str(e)}"))
+                st.rerun()
 
     # ---- Quick Actions ---- #
     st.subheader("Quick Actions")
@@ -287,30 +273,31 @@ def chatbot_page():
                             "🗓️ Weekly Sessions",
                             "👩‍💼 Women Leadership Stories"
                         ]:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            bot_reply = loop.run_until_complete(search_serper(query))
-                            loop.close()
-                        elif label == "💼 Job from naukri.com":
+                            # The backend pools and caches the Serper calls
                             response = requests.post(
-                                NAUKRI_JOBS_ENDPOINT,
+                                SEARCH_ENDPOINT,
                                 json={
                                     "session_id": st.session_state.session_id,
                                     "query": query
                                 }
                             )
                             response.raise_for_status()
-                            bot_reply = response.json().get("response", "Sorry, I couldn't find any jobs from Naukri.com.")
-                        else:
+                            bot_reply = response.json().get("response", "Unable to fetch updates at this time.")
+                        elif label == "💼 Job from naukri.com":
                             response = requests.post(
-                                CHAT_ENDPOINT,
+                                NAUKRI_JOBS_ENDPOINT,
                                 json={
                                     "session_id": st.session_state.session_id,
                                     "query": query
                                 }
                             )
                             response.raise_for_status()
-                            bot_reply = response.json().get("response", "Sorry, I couldn't understand that.")
+                            bot_reply = response.json().get("response", "Sorry, I couldn't find any jobs from Naukri.com.")
+                        else:
+                            bot_reply = stream_chat_reply({
+                                "session_id": st.session_state.session_id,
+                                "query": query
+                            })
                         
                         st.session_state.chat_history.append(("Asha", bot_reply))
                         st.rerun()